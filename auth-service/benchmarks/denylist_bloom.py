@@ -0,0 +1,61 @@
+"""Память и стоимость проверки bloom-фильтра отозванных jti.
+
+PYTHONPATH=auth-service/src python auth-service/benchmarks/denylist_bloom.py
+"""
+import time
+import tracemalloc
+from uuid import UUID, uuid4
+
+import typer
+
+from utils.bloom import TimeBucketedBloomFilter
+
+
+def main(
+    revoked: int = 1_000_000,
+    error_rate: float = 0.001,
+    lifetime: int = 600,
+    lookups: int = 200_000,
+):
+    now = time.time()
+    # Ключи в фильтре и в памяти воркера - 16 байт UUID(jti).bytes, как в
+    # Denylist; строковые jti из claims переводятся в них при проверке
+    jtis = [uuid4().bytes for _ in range(revoked)]
+    # Время жизни отозванных токенов равномерно распределено по окну
+    exps = [now + lifetime * i / revoked for i in range(revoked)]
+
+    bloom = TimeBucketedBloomFilter(revoked, error_rate, lifetime)
+    started = time.perf_counter()
+    for jti, exp in zip(jtis, exps):
+        bloom.add(jti, exp)
+    add_seconds = time.perf_counter() - started
+
+    unknown = [str(uuid4()) for _ in range(lookups)]
+    started = time.perf_counter()
+    false_positives = sum(bloom.might_contain(UUID(jti).bytes, now) for jti in unknown)
+    miss_seconds = time.perf_counter() - started
+
+    claims = [str(UUID(bytes=jti)) for jti in jtis[:lookups]]
+    started = time.perf_counter()
+    hits = sum(bloom.might_contain(UUID(jti).bytes, now) for jti in claims)
+    hit_seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    # Свои объекты ключей, как у Denylist._entries
+    entries = {UUID(bytes=jti).bytes: exp for jti, exp in zip(jtis, exps)}
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"revoked tokens:         {revoked}")
+    print(f"bloom memory:           {bloom.nbytes / 2**20:.1f} MiB")
+    print(f"dict memory:            {dict_bytes / 2**20:.1f} MiB ({len(entries)})")
+    print(f"add:                    {add_seconds / revoked * 1e6:.2f} us")
+    # Вместе с UUID(jti).bytes, как в Denylist._check_local
+    print(f"lookup, not revoked:    {miss_seconds / lookups * 1e6:.2f} us")
+    print(f"lookup, revoked:        {hit_seconds / lookups * 1e6:.2f} us")
+    print(f"false positive rate:    {false_positives / lookups:.5f}")
+    print(f"false negatives:        {lookups - hits}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,70 @@
+"""Память Redis под отозванные токены в разных форматах хранения.
+
+Перед каждым замером база очищается (FLUSHDB), поэтому укажите
+отдельную базу, например:
+
+PYTHONPATH=auth-service/src python auth-service/benchmarks/denylist_memory.py \
+    --redis-dsn redis://127.0.0.1:6379/15
+"""
+import asyncio
+import time
+from uuid import uuid4
+
+import typer
+from redis.asyncio import Redis
+
+from db.denylist import BUCKET_PREFIX, KEY_PREFIX
+
+
+def legacy(pipe, jti, exp, now):
+    # Формат до перехода на бинарные ключи
+    pipe.setex(str(jti), 600, "logout")
+
+
+def keys(pipe, jti, exp, now):
+    pipe.set(KEY_PREFIX + jti.bytes, b"", px=int((exp - now) * 1000))
+
+
+def buckets(pipe, jti, exp, now):
+    minute = int(exp // 60)
+    pipe.hset(BUCKET_PREFIX + str(minute).encode(), jti.bytes, b"")
+    pipe.expireat(BUCKET_PREFIX + str(minute).encode(), (minute + 1) * 60)
+
+
+async def measure(redis: Redis, write, count: int, lifetime: int) -> int:
+    await redis.flushdb()
+    before = (await redis.info("memory"))["used_memory"]
+    now = time.time()
+    for start in range(0, count, 10_000):
+        async with redis.pipeline(transaction=False) as pipe:
+            for i in range(start, min(start + 10_000, count)):
+                write(pipe, uuid4(), now + lifetime * (i + 1) / count, now)
+            await pipe.execute()
+    used = (await redis.info("memory"))["used_memory"] - before
+    await redis.flushdb()
+    return used
+
+
+async def run(redis_dsn: str, count: int, lifetime: int):
+    redis = Redis.from_url(redis_dsn)
+    try:
+        for write in (legacy, keys, buckets):
+            used = await measure(redis, write, count, lifetime)
+            print(
+                f"{write.__name__:8} {used / 2**20:8.1f} MiB "
+                f"{used / count:6.1f} bytes/token"
+            )
+    finally:
+        await redis.close()
+
+
+def main(
+    redis_dsn: str = "redis://127.0.0.1:6379/15",
+    count: int = 100_000,
+    lifetime: int = 600,
+):
+    asyncio.run(run(redis_dsn, count, lifetime))
+
+
+if __name__ == "__main__":
+    typer.run(main)
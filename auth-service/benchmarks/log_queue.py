@@ -0,0 +1,58 @@
+"""Сколько стоит вызов logger.info при медленном приёмнике логов.
+
+Приёмник тратит на запись по 1 мс (забитый pipe, сетевой сборщик).
+direct - обработчик вызывается прямо в коде запроса, queue - запись
+через очередь configure_logging. Для queue печатается и число
+отброшенных записей: приёмник не успевает за потоком логов.
+
+PYTHONPATH=auth-service/src python auth-service/benchmarks/log_queue.py
+"""
+import logging
+import queue
+import time
+
+import typer
+
+from core.logging import BoundedQueueHandler, HandlersQueueListener
+from core.metrics import LOG_RECORDS_DROPPED
+
+
+class SlowHandler(logging.Handler):
+    def emit(self, record: logging.LogRecord) -> None:
+        self.format(record)
+        time.sleep(0.001)
+
+
+def measure(logger: logging.Logger, records: int) -> float:
+    started = time.perf_counter()
+    for i in range(records):
+        logger.info("request %s done", i)
+    return (time.perf_counter() - started) / records
+
+
+def run(records: int, queue_size: int) -> None:
+    logger = logging.getLogger("benchmark")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    logger.addHandler(SlowHandler())
+    print(f"direct {measure(logger, records) * 1e6:8.1f} us/record")
+    logger.handlers.clear()
+
+    log_queue = queue.Queue(queue_size)
+    logger.addHandler(BoundedQueueHandler(log_queue, [SlowHandler()]))
+    listener = HandlersQueueListener(log_queue)
+    listener.start()
+    dropped = LOG_RECORDS_DROPPED._value.get()
+    seconds = measure(logger, records)
+    dropped = LOG_RECORDS_DROPPED._value.get() - dropped
+    listener.stop()
+    print(f"queue  {seconds * 1e6:8.1f} us/record, dropped {dropped:.0f}")
+
+
+def main(records: int = 2_000, queue_size: int = 10_000):
+    run(records, queue_size)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,128 @@
+"""Пропускная способность /check_access с прежним и текущим набором middleware.
+
+Запросы с токеном идут прямо в ASGI-приложение с роутером авторизации.
+before - SessionMiddleware на всё приложение и before_request через
+@app.middleware("http") (BaseHTTPMiddleware), after - чистые
+ASGI-middleware из core.middleware. Отзыв токенов проверяется в Redis:
+
+PYTHONPATH=auth-service/src python auth-service/benchmarks/middleware.py \
+    --redis-dsn redis://127.0.0.1:6379
+"""
+import asyncio
+import time
+import uuid
+
+import typer
+from fastapi import FastAPI, Request, status
+from fastapi.responses import ORJSONResponse
+from starlette.middleware.sessions import SessionMiddleware
+
+from api.v1 import auth
+from core.jwt import AuthJWT
+from core.metrics import MetricsMiddleware
+from core.middleware import RequestIdMiddleware
+from core.settings import settings
+from db import denylist
+from db.redis import MeasuredRedis
+
+
+async def before_request(request: Request, call_next):
+    request_id = request.headers.get("X-Request-Id")
+    if not request_id and request.url.path != "/metrics":
+        return ORJSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"detail": "X-Request-Id is required"},
+        )
+    return await call_next(request)
+
+
+def create_app(stack: str) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(auth.router, prefix="/api/v1")
+    if stack == "before":
+        app.add_middleware(SessionMiddleware, secret_key=settings.session_secret_key)
+        app.add_middleware(MetricsMiddleware)
+        app.middleware("http")(before_request)
+    else:
+        app.add_middleware(MetricsMiddleware)
+        app.add_middleware(RequestIdMiddleware)
+    return app
+
+
+async def call(app: FastAPI, token: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/v1/check_access",
+        "raw_path": b"/api/v1/check_access",
+        "query_string": b"",
+        "headers": [
+            (b"authorization", f"Bearer {token}".encode()),
+            (b"x-request-id", uuid.uuid4().hex.encode()),
+            # Cookie сессии, как у браузера после входа через соцсеть
+            (b"cookie", b"session=" + b"x" * 200),
+        ],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+    }
+    status_code = 0
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            # Клиент не отключается: BaseHTTPMiddleware ждёт http.disconnect
+            await asyncio.Event().wait()
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def run(requests: int, concurrency: int, redis_dsn: str) -> None:
+    AuthJWT.load_config(lambda: settings)
+    AuthJWT.token_in_denylist_loader(lambda token: denylist.denylist.is_revoked(token))
+    redis = MeasuredRedis.from_url(redis_dsn)
+    denylist.denylist = denylist.Denylist(redis, settings.denylist_cache_max_entries)
+    token = await AuthJWT().create_access_token(
+        subject=str(uuid.uuid4()),
+        user_claims={"session_id": str(uuid.uuid4()), "roles": [], "gen": 0},
+    )
+
+    for stack in ("before", "after"):
+        app = create_app(stack)
+        status_code = await call(app, token)
+        if status_code != status.HTTP_204_NO_CONTENT:
+            raise RuntimeError(f"check_access returned {status_code}")
+
+        async def worker():
+            for _ in range(requests // concurrency):
+                await call(app, token)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        seconds = time.perf_counter() - started
+        print(f"{stack:6} {requests / seconds:8.0f} requests/s")
+
+    await redis.close()
+
+
+def main(
+    requests: int = 20_000,
+    concurrency: int = 50,
+    redis_dsn: str = settings.redis_dsn,
+):
+    asyncio.run(run(requests, concurrency, redis_dsn))
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,103 @@
+"""Сколько стоит LoggingRoute на запрос.
+
+Запросы с JSON-телом идут прямо в ASGI-приложение с тремя маршрутами:
+plain - обычный APIRoute, before - прежний LoggingRoute (всегда читал
+и разбирал тело), after - текущий. На уровне INFO after должен быть
+не медленнее plain, на DEBUG видна цена записи лога.
+
+PYTHONPATH=auth-service/src python auth-service/benchmarks/request_logging.py
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Callable
+
+import typer
+from fastapi import APIRouter, FastAPI, Request, Response
+from fastapi.routing import APIRoute
+
+from core.logging import LoggingRoute
+
+
+class BeforeLoggingRoute(APIRoute):
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def custom_route_handler(request: Request) -> Response:
+            msg = f"{request.method} {request.url.path} {request.query_params}"
+            request_body = await request.body()
+            if request_body:
+                msg += f" {json.loads(request_body)}"
+            logging.debug(msg)
+            return await original_route_handler(request)
+
+        return custom_route_handler
+
+
+async def endpoint(credentials: dict) -> dict:
+    return {}
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    for name, route_class in [
+        ("plain", APIRoute),
+        ("before", BeforeLoggingRoute),
+        ("after", LoggingRoute),
+    ]:
+        router = APIRouter(route_class=route_class)
+        router.add_api_route(f"/{name}", endpoint, methods=["POST"])
+        app.include_router(router)
+    return app
+
+
+async def call(app: FastAPI, path: str, body: bytes) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+async def run(requests: int) -> None:
+    app = create_app()
+    credentials = {"username": "ivanov@mail.ru", "password": "secret"}  # noqa: S105
+    body = json.dumps(credentials).encode()
+    for level in (logging.INFO, logging.DEBUG):
+        logging.getLogger().setLevel(level)
+        for path in ("/plain", "/before", "/after"):
+            started = time.perf_counter()
+            for _ in range(requests):
+                await call(app, path, body)
+            seconds = time.perf_counter() - started
+            print(
+                f"{logging.getLevelName(level):5} {path[1:]:6} "
+                f"{seconds / requests * 1e6:6.1f} us/request"
+            )
+
+
+def main(requests: int = 20_000):
+    # Логи на DEBUG уходят в никуда, измеряем только их подготовку
+    logging.basicConfig(handlers=[logging.NullHandler()])
+    asyncio.run(run(requests))
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,129 @@
+"""Память воркера при создании сервисов на каждый запрос.
+
+Запросы идут прямо в ASGI-приложение, маршрут зависит от
+get_session_service (сессия БД, AuthJWT, AuthService). after - текущие
+фабрики: сервисы живут один запрос. before - те же фабрики под
+@lru_cache(), как было раньше: кеш не попадает ни разу, но держит
+последние 128 сессий и запросов на каждую фабрику. После каждой десятой
+части запросов печатается RSS процесса и число ещё живых сессий.
+Запросы к базе не выполняются, поэтому Postgres не нужен.
+
+PYTHONPATH=auth-service/src python auth-service/benchmarks/service_memory.py
+"""
+import asyncio
+import gc
+import resource
+import time
+import weakref
+from functools import lru_cache
+
+import typer
+from fastapi import Depends, FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.jwt import AuthJWT
+from db import postgres
+from db.denylist import Denylist, get_denylist
+from db.postgres import get_session
+from db.roles_cache import RolesCache, get_roles_cache
+from services.auth import AuthService
+from services.session import SessionService, get_session_service
+
+sessions = weakref.WeakSet()
+session_factory = postgres.async_session
+
+
+def tracked_session() -> AsyncSession:
+    session = session_factory()
+    sessions.add(session)
+    return session
+
+
+@lru_cache()
+def cached_auth_service(
+    db: AsyncSession = Depends(get_session),
+    denylist: Denylist = Depends(get_denylist),
+    roles_cache: RolesCache = Depends(get_roles_cache),
+    auth_jwt: AuthJWT = Depends(),
+) -> AuthService:
+    return AuthService(db, denylist, roles_cache, auth_jwt)
+
+
+@lru_cache()
+def cached_session_service(
+    db: AsyncSession = Depends(get_session),
+    auth_jwt: AuthJWT = Depends(),
+    auth_service: AuthService = Depends(cached_auth_service),
+) -> SessionService:
+    return SessionService(db, auth_jwt, auth_service)
+
+
+async def after(service: SessionService = Depends(get_session_service)) -> dict:
+    return {}
+
+
+async def before(service: SessionService = Depends(cached_session_service)) -> dict:
+    return {}
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_api_route("/after", after)
+    app.add_api_route("/before", before)
+    return app
+
+
+async def call(app: FastAPI, path: str) -> None:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+
+
+def rss_mb() -> float:
+    # ru_maxrss в Linux - в килобайтах
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def run(requests: int) -> None:
+    # Сессии get_session создаёт через postgres.async_session
+    postgres.async_session = tracked_session
+    app = create_app()
+    # after первым: пиковый RSS процесса не уменьшается
+    for name in ("after", "before"):
+        started = time.perf_counter()
+        for i in range(1, requests + 1):
+            await call(app, f"/{name}")
+            if i % (requests // 10) == 0:
+                gc.collect()
+                print(
+                    f"{name:6} {i:8} requests  rss {rss_mb():6.1f} MB  "
+                    f"live sessions {len(sessions):4}"
+                )
+        seconds = time.perf_counter() - started
+        print(f"{name:6} {seconds / requests * 1e6:.1f} us/request")
+
+
+def main(requests: int = 1_000_000):
+    asyncio.run(run(requests))
+
+
+if __name__ == "__main__":
+    typer.run(main)
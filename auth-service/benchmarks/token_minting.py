@@ -0,0 +1,53 @@
+"""Сколько пар токенов в секунду выпускает create_token_pair.
+
+before - подпись и повторное декодирование токенов ради jti и exp,
+after - mint_token, который возвращает их вместе с токеном.
+
+PYTHONPATH=auth-service/src python auth-service/benchmarks/token_minting.py
+"""
+import asyncio
+import time
+from uuid import uuid4
+
+import typer
+from async_fastapi_jwt_auth import AuthJWT
+
+from core.settings import settings
+from utils.tokens import mint_token
+
+
+async def before(auth_jwt: AuthJWT, subject: str, claims: dict) -> None:
+    access_token = await auth_jwt.create_access_token(
+        subject=subject, user_claims=claims
+    )
+    refresh_token = await auth_jwt.create_refresh_token(
+        subject=subject, user_claims={"session_id": claims["session_id"]}
+    )
+    await auth_jwt.get_raw_jwt(access_token)
+    await auth_jwt.get_raw_jwt(refresh_token)
+
+
+async def after(auth_jwt: AuthJWT, subject: str, claims: dict) -> None:
+    await mint_token(auth_jwt, "access", subject, claims)
+    await mint_token(auth_jwt, "refresh", subject, {"session_id": claims["session_id"]})
+
+
+async def run(pairs: int) -> None:
+    auth_jwt = AuthJWT()
+    subject = str(uuid4())
+    claims = {"session_id": str(uuid4()), "roles": ["admin"], "gen": 0}
+    for mint in (before, after):
+        started = time.perf_counter()
+        for _ in range(pairs):
+            await mint(auth_jwt, subject, claims)
+        seconds = time.perf_counter() - started
+        print(f"{mint.__name__:6} {pairs / seconds:8.0f} pairs/s")
+
+
+def main(pairs: int = 20_000):
+    AuthJWT.load_config(lambda: settings)
+    asyncio.run(run(pairs))
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,6 +1,12 @@
 #!/usr/bin/env bash
 set -e
 
+# Метрики прошлого запуска не должны попасть в /metrics
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 alembic upgrade head
 
 gunicorn main:app --bind 0.0.0.0:8000 -w ${WORKERS:-1} -k uvicorn.workers.UvicornWorker
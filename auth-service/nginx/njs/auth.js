@@ -0,0 +1,10 @@
+// Ключ кеша вердиктов auth_request: в кеше nginx лежит хеш, а не сам токен
+function tokenHash(r) {
+    var authorization = r.headersIn.Authorization;
+    if (!authorization) {
+        return "";
+    }
+    return require("crypto").createHash("sha256").update(authorization).digest("hex");
+}
+
+export default {tokenHash};
@@ -0,0 +1,68 @@
+"""indexes
+
+Revision ID: d0f6401b1bf8
+Revises: 74360d1ab984
+Create Date: 2026-10-18 19:05:41.220314
+
+"""
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d0f6401b1bf8"
+down_revision = "74360d1ab984"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Перед уникальным индексом убираем повторно выданные роли
+    op.execute(
+        "DELETE FROM user_roles a USING user_roles b "
+        "WHERE a.user_id = b.user_id AND a.role_id = b.role_id AND a.ctid > b.ctid"
+    )
+    # CONCURRENTLY не работает внутри транзакции, зато не блокирует запись
+    with op.get_context().autocommit_block():
+        # Список сессий пользователя, от новых к старым. id - для
+        # однозначного порядка страниц при равных created_at.
+        # Фильтр активных сессий тоже читает этот индекс: сессия живёт не
+        # дольше refresh-токена, поэтому активные - самые новые, и скан
+        # останавливается, набрав страницу. Отдельный (user_id, session_exp)
+        # не нужен: с ним планировщику пришлось бы сортировать
+        op.create_index(
+            "ix_sessions_user_id_created_at_id",
+            "sessions",
+            ["user_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_user_roles_user_id_role_id",
+            "user_roles",
+            ["user_id", "role_id"],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_user_roles_role_id",
+            "user_roles",
+            ["role_id"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_social_account_user_id",
+            "social_account",
+            ["user_id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, index in [
+            ("social_account", "ix_social_account_user_id"),
+            ("user_roles", "ix_user_roles_role_id"),
+            ("user_roles", "ix_user_roles_user_id_role_id"),
+            ("sessions", "ix_sessions_user_id_created_at_id"),
+        ]:
+            op.drop_index(index, table_name=table, postgresql_concurrently=True)
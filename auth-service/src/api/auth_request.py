@@ -0,0 +1,69 @@
+"""Проверка токена для nginx auth_request.
+
+nginx передаёт Authorization исходного запроса и роли из X-Allow-Roles и
+пропускает запрос при 2xx. Id и роли пользователя возвращаются в заголовках
+X-User-Id и X-User-Roles, срок кеширования вердикта - в Cache-Control.
+"""
+import time
+
+from fastapi import status
+from fastapi.responses import ORJSONResponse
+from starlette.requests import Request
+from starlette.responses import Response
+
+from core.jwt import AuthJWT
+from core.settings import settings
+from db import denylist
+from schemas.auth import TokenCheck
+from services.auth import verify_tokens
+
+
+def cache_control(max_age: int) -> str:
+    # nginx не кеширует ответы с no-store
+    return f"max-age={max_age}" if max_age > 0 else "no-store"
+
+
+async def authorize(request: Request) -> Response:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return ORJSONResponse(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            content={"detail": "Missing Authorization Header"},
+            headers={"Cache-Control": cache_control(0)},
+        )
+    allow_roles = [
+        role.strip()
+        for role in request.headers.get("X-Allow-Roles", "").split(",")
+        if role.strip()
+    ]
+
+    # Свой AuthJWT на запрос: он запоминает проверенный токен
+    auth_jwt = AuthJWT()
+    [verdict] = await verify_tokens(
+        auth_jwt,
+        denylist.denylist,
+        [TokenCheck.construct(token=token, allow_roles=allow_roles or None)],
+    )
+    max_age = settings.auth_request_cache_seconds
+    if verdict.status_code != status.HTTP_204_NO_CONTENT:
+        # Отказ для токена не меняется: роли записаны в нём самом.
+        # auth_request понимает только 2xx, 401 и 403
+        return ORJSONResponse(
+            status_code=status.HTTP_403_FORBIDDEN
+            if verdict.status_code == status.HTTP_403_FORBIDDEN
+            else status.HTTP_401_UNAUTHORIZED,
+            content={"detail": verdict.detail},
+            headers={"Cache-Control": cache_control(max_age)},
+        )
+
+    claims = await auth_jwt.decode_access_token(token)
+    # Вердикт не кешируется дольше срока жизни токена
+    max_age = min(max_age, int(claims["exp"] - time.time()))
+    return Response(
+        status_code=status.HTTP_200_OK,
+        headers={
+            "X-User-Id": claims["sub"],
+            "X-User-Roles": ",".join(claims["roles"]),
+            "Cache-Control": cache_control(max_age),
+        },
+    )
@@ -1,12 +1,18 @@
 from typing import Annotated, Literal
 
-from async_fastapi_jwt_auth import AuthJWT
 from async_fastapi_jwt_auth.exceptions import MissingTokenError
 from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, status
 from fastapi.security import HTTPBearer
 
+from core.jwt import AuthJWT
 from core.logging import LoggingRoute
-from schemas.auth import Credentials, LoginResponse, TokenPair
+from schemas.auth import (
+    Credentials,
+    LoginResponse,
+    TokenBatch,
+    TokenBatchResponse,
+    TokenPair,
+)
 from schemas.base import HTTPExceptionResponse
 from services.auth import AuthService, get_auth_service
 
@@ -94,3 +100,16 @@ async def check_access(
     auth_service: AuthService = Depends(get_auth_service),
 ) -> None:
     await auth_service.check_access(allow_roles)
+
+
+@router.post(
+    "/check_access/batch",
+    response_model=TokenBatchResponse,
+    summary="Проверка доступа для нескольких токенов",
+)
+async def check_access_batch(
+    batch: TokenBatch,
+    auth_service: AuthService = Depends(get_auth_service),
+) -> TokenBatchResponse:
+    verdicts = await auth_service.check_access_batch(batch.tokens)
+    return TokenBatchResponse(verdicts=verdicts)
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, Header, HTTPException, Path, status
 from fastapi.responses import RedirectResponse
 from starlette.requests import Request
 
-from core.logging import LoggingRoute
+from core.middleware import SessionRoute
 from core.settings import settings
 from schemas.base import HTTPExceptionResponse
 from services.auth import AuthService, get_auth_service
@@ -16,7 +16,7 @@ from utils.random import generate_random_string
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(route_class=LoggingRoute)
+router = APIRouter(route_class=SessionRoute)
 
 
 @router.get(
@@ -1,7 +1,7 @@
-from async_fastapi_jwt_auth import AuthJWT
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 
+from core.jwt import get_access_claims
 from core.logging import LoggingRoute
 from schemas.base import HTTPExceptionResponse
 from schemas.users import UserPatch, UserResponse
@@ -16,6 +16,7 @@ get_token = HTTPBearer(auto_error=False)
     "",
     response_model=UserResponse,
     summary="Данные профиля",
+    dependencies=[Depends(get_access_claims)],
     responses={
         status.HTTP_401_UNAUTHORIZED: {"model": HTTPExceptionResponse},
         status.HTTP_404_NOT_FOUND: {"model": HTTPExceptionResponse},
@@ -23,10 +24,8 @@ get_token = HTTPBearer(auto_error=False)
 )
 async def get_current_user(
     access_token: str = Depends(get_token),
-    auth_jwt: AuthJWT = Depends(),
     user_service: UserService = Depends(get_user_service),
 ) -> UserResponse:
-    await auth_jwt.jwt_required()
     user = await user_service.get_current_user()
     if not user:
         raise HTTPException(
@@ -39,6 +38,7 @@ async def get_current_user(
     "",
     response_model=UserResponse,
     summary="Изменение данных профиля",
+    dependencies=[Depends(get_access_claims)],
     responses={
         status.HTTP_401_UNAUTHORIZED: {"model": HTTPExceptionResponse},
         status.HTTP_404_NOT_FOUND: {"model": HTTPExceptionResponse},
@@ -47,10 +47,8 @@ async def get_current_user(
 async def patch_current_user(
     user_patch: UserPatch,
     access_token: str = Depends(get_token),
-    auth_jwt: AuthJWT = Depends(),
     user_service: UserService = Depends(get_user_service),
 ) -> UserResponse:
-    await auth_jwt.jwt_required()
     user = await user_service.patch_current_user(user_patch)
     if not user:
         raise HTTPException(
@@ -40,11 +40,10 @@ async def create_user_role(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Role not found"
         )
-    if await user_role_service.get_user_role(user_id, role_id):
+    if not await user_role_service.create_user_role(user_id, role_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="User role already exists"
         )
-    await user_role_service.create_user_role(user_id, role_id)
 
 
 @router.delete(
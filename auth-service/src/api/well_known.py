@@ -0,0 +1,33 @@
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, Header, Response, status
+
+from core.jwt import KeySet, get_keyset
+from core.logging import LoggingRoute
+from core.settings import settings
+
+router = APIRouter(route_class=LoggingRoute)
+
+
+@router.get(
+    "/jwks.json",
+    summary="Публичные ключи для проверки токенов",
+    response_class=Response,
+    responses={
+        status.HTTP_200_OK: {"content": {"application/json": {}}},
+        status.HTTP_304_NOT_MODIFIED: {},
+    },
+)
+async def jwks(
+    if_none_match: Annotated[Optional[str], Header(include_in_schema=False)] = None,
+    keyset: KeySet = Depends(get_keyset),
+) -> Response:
+    headers = {
+        "ETag": keyset.etag,
+        "Cache-Control": f"public, max-age={settings.jwks_max_age}",
+    }
+    if if_none_match and keyset.etag in [
+        etag.strip() for etag in if_none_match.split(",")
+    ]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(keyset.jwks, media_type="application/json", headers=headers)
@@ -6,8 +6,11 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.postgres import async_session
+from db.redis import close_redis, create_redis
+from db.roles_cache import RolesCache
 from models.roles import Role, UserRole
 from models.users import User
+from utils.password import hash_password
 
 
 async def get_user_id(db: AsyncSession, email: str) -> UUID:
@@ -26,7 +29,7 @@ async def get_user_id(db: AsyncSession, email: str) -> UUID:
 
     name = typer.prompt("Введите имя для нового пользователя")
 
-    user = User(email=email, password=password, name=name)
+    user = User(email=email, password_hash=await hash_password(password), name=name)
     db.add(user)
     await db.commit()
     await db.refresh(user)
@@ -70,6 +73,10 @@ async def async_main():
         user_role = UserRole(user_id=user_id, role_id=role_id)
         db.add(user_role)
         await db.commit()
+
+        redis = create_redis()
+        await RolesCache(redis).invalidate_user(str(user_id))
+        await close_redis(redis)
         print("Пользователю добавлена роль admin.")
 
 
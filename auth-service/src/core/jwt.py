@@ -0,0 +1,199 @@
+import hashlib
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+import jwt
+import orjson
+from async_fastapi_jwt_auth import AuthJWT as BaseAuthJWT
+from async_fastapi_jwt_auth.exceptions import (
+    AccessTokenRequired,
+    InvalidHeaderError,
+    JWTDecodeError,
+)
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+from fastapi import Depends
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+
+class SigningKey(NamedTuple):
+    kid: str
+    algorithm: str
+    public_key: Any
+    # У выведенных из оборота ключей может остаться только публичная часть
+    private_key: Optional[Any]
+
+
+class KeySet:
+    """Ключи подписи токенов.
+
+    Токены подписываются одним ключом, проверяются любым из набора по kid
+    из заголовка. Публичные ключи отдаются в /.well-known/jwks.json.
+    """
+
+    def __init__(self, keys: list[SigningKey], signing_kid: Optional[str] = None):
+        self.keys = {key.kid: key for key in keys}
+        self.signing_key: Optional[SigningKey] = None
+        if keys:
+            # По умолчанию подписываем последним по имени ключом
+            self.signing_key = self.keys[signing_kid or keys[-1].kid]
+            if not self.signing_key.private_key:
+                raise ValueError(f"No private key for kid {self.signing_key.kid}")
+
+        self.jwks = orjson.dumps({"keys": [_to_jwk(key) for key in keys]})
+        self.etag = f'"{hashlib.sha256(self.jwks).hexdigest()[:32]}"'
+
+    @classmethod
+    def load(cls, keys_dir: Optional[Path], signing_kid: Optional[str]) -> "KeySet":
+        """Читает PEM-ключи из keys_dir, kid - имя файла без расширения."""
+        if not keys_dir:
+            return cls([])
+
+        keys = []
+        for path in sorted(keys_dir.glob("*.pem")):
+            data = path.read_bytes()
+            private_key = None
+            if b"PRIVATE KEY" in data:
+                private_key = load_pem_private_key(data, password=None)
+                public_key = private_key.public_key()
+            else:
+                public_key = load_pem_public_key(data)
+
+            if isinstance(public_key, RSAPublicKey):
+                algorithm = "RS256"
+            elif isinstance(public_key, Ed25519PublicKey):
+                algorithm = "EdDSA"
+            else:
+                raise ValueError(f"Unsupported key type in {path}")
+            keys.append(SigningKey(path.stem, algorithm, public_key, private_key))
+        return cls(keys, signing_kid)
+
+
+def _to_jwk(key: SigningKey) -> dict:
+    if key.algorithm == "RS256":
+        jwk = RSAAlgorithm.to_jwk(key.public_key)
+    else:
+        jwk = OKPAlgorithm.to_jwk(key.public_key)
+    return {**orjson.loads(jwk), "kid": key.kid, "alg": key.algorithm, "use": "sig"}
+
+
+keyset: Optional[KeySet] = None
+
+
+async def get_keyset() -> KeySet:
+    return keyset
+
+
+class AccessClaims(NamedTuple):
+    """Claims проверенного access-токена."""
+
+    sub: str
+    jti: str
+    session_id: str
+    roles: list[str]
+    raw: dict
+
+    @classmethod
+    def from_raw(cls, raw: dict) -> "AccessClaims":
+        return cls(raw["sub"], raw["jti"], raw["session_id"], raw["roles"], raw)
+
+
+class AuthJWT(BaseAuthJWT):
+    """AuthJWT, подписывающий токены ключами из keyset.
+
+    Если ключей нет, работает как обычно (HS256 и authjwt_secret_key).
+    FastAPI создаёт один AuthJWT на запрос для роутера и всех сервисов,
+    поэтому проверенные токены запоминаются в нём: подпись и отзыв
+    проверяются один раз за запрос.
+    """
+
+    _verified: Optional[dict] = None
+    _access_claims: Optional[AccessClaims] = None
+
+    async def access_claims(self) -> AccessClaims:
+        """Проверяет access-токен запроса и возвращает его claims."""
+        if self._access_claims is None:
+            await self.jwt_required()
+            self._access_claims = AccessClaims.from_raw(await self.get_raw_jwt())
+        return self._access_claims
+
+    @property
+    def verified_access_claims(self) -> Optional[AccessClaims]:
+        """Claims access-токена запроса, если он уже проверен."""
+        return self._access_claims
+
+    @property
+    def request_token(self) -> Optional[str]:
+        """Токен из заголовка Authorization запроса."""
+        return self._token
+
+    def remember_access_claims(self, raw: dict) -> None:
+        """Запоминает claims токена запроса, уже проверенного verify_tokens."""
+        self._access_claims = AccessClaims.from_raw(raw)
+
+    async def decode_access_token(self, encoded_token: str) -> dict:
+        """Проверяет подпись, issuer и тип access-токена, но не отзыв."""
+        raw = await self._verified_token(encoded_token, self._decode_issuer)
+        if raw["type"] != "access":
+            raise AccessTokenRequired(
+                status_code=422, message="Only access tokens are allowed"
+            )
+        return raw
+
+    async def _create_token(self, *args, algorithm=None, headers=None, **kwargs):
+        if keyset and keyset.signing_key:
+            algorithm = keyset.signing_key.algorithm
+            headers = {**(headers or {}), "kid": keyset.signing_key.kid}
+        return await super()._create_token(
+            *args, algorithm=algorithm, headers=headers, **kwargs
+        )
+
+    async def _get_secret_key(self, algorithm: str, process: str):
+        if keyset and keyset.signing_key and process == "encode":
+            return keyset.signing_key.private_key
+        return await super()._get_secret_key(algorithm, process)
+
+    async def _verified_token(self, encoded_token: str, issuer: Optional[str] = None):
+        # Библиотека разбирает один и тот же токен несколько раз
+        # (jwt_required, get_raw_jwt, get_jwt_subject)
+        if self._verified is None:
+            self._verified = {}
+        key = (encoded_token, issuer)
+        if key not in self._verified:
+            self._verified[key] = await self._decode_token(encoded_token, issuer)
+        return self._verified[key]
+
+    async def _decode_token(self, encoded_token: str, issuer: Optional[str]):
+        if not (keyset and keyset.keys):
+            return await super()._verified_token(encoded_token, issuer)
+
+        try:
+            headers = jwt.get_unverified_header(encoded_token)
+        except Exception as err:
+            raise InvalidHeaderError(status_code=422, message=str(err))
+
+        # Алгоритм берём из ключа, а не из заголовка токена
+        key = keyset.keys.get(headers.get("kid"))
+        if not key:
+            raise JWTDecodeError(status_code=422, message="Unknown signing key")
+
+        try:
+            return jwt.decode(
+                encoded_token,
+                key.public_key,
+                issuer=issuer,
+                audience=self._decode_audience,
+                leeway=self._decode_leeway,
+                algorithms=[key.algorithm],
+            )
+        except Exception as err:
+            raise JWTDecodeError(status_code=422, message=str(err))
+
+
+async def get_access_claims(auth_jwt: AuthJWT = Depends()) -> AccessClaims:
+    """Зависимость защищённых маршрутов: 401 без действующего access-токена."""
+    return await auth_jwt.access_claims()
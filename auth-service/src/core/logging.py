@@ -1,24 +1,55 @@
-import json
+import atexit
+import copy
 import logging
-from typing import Callable
+import logging.config
+import queue
+import random
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable
 
+import orjson
 from fastapi import Request, Response
 from fastapi.routing import APIRoute
 
+from core.metrics import LOG_RECORDS_DROPPED
 from core.settings import settings
 
-LOG_FORMAT = (
-    "[%(asctime)s] [%(process)d] [%(levelname)s] [%(name)s] %(message)s"  # noqa: E501
-)
+LOG_FORMAT = "[%(asctime)s] [%(process)d] [%(levelname)s] [%(name)s] [%(request_id)s] %(message)s"  # noqa: E501
 LOG_DEFAULT_HANDLERS = [
     "console",
 ]
 
+# X-Request-Id текущего запроса, см. core.middleware.RequestIdMiddleware
+request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "process": record.process,
+            "request_id": record.request_id,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc_info"] = record.exc_text
+        return orjson.dumps(data).decode()
+
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "verbose": {"format": LOG_FORMAT},
+        "json": {"()": JsonFormatter},
         "default": {
             "()": "uvicorn.logging.DefaultFormatter",
             "fmt": "%(levelprefix)s %(message)s",
@@ -26,14 +57,14 @@ LOGGING = {
         },
         "access": {
             "()": "uvicorn.logging.AccessFormatter",
-            "fmt": "%(levelprefix)s %(client_addr)s - '%(request_line)s' %(status_code)s",  # noqa: E501
+            "fmt": "%(levelprefix)s [%(request_id)s] %(client_addr)s - '%(request_line)s' %(status_code)s",  # noqa: E501
         },
     },
     "handlers": {
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
-            "formatter": "verbose",
+            "formatter": "json" if settings.log_format == "json" else "verbose",
         },
         "default": {
             "formatter": "default",
@@ -41,7 +72,7 @@ LOGGING = {
             "stream": "ext://sys.stdout",
         },
         "access": {
-            "formatter": "access",
+            "formatter": "json" if settings.log_format == "json" else "access",
             "class": "logging.StreamHandler",
             "stream": "ext://sys.stdout",
         },
@@ -68,18 +99,158 @@ LOGGING = {
 }
 
 
+_exc_formatter = logging.Formatter()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """Кладёт записи в очередь, из которой их пишет поток слушателя.
+
+    Запись уходит в очередь вместе с обработчиками, которые заменил этот
+    обработчик, поэтому одного потока хватает на все логгеры.
+    """
+
+    def __init__(self, log_queue: queue.Queue, handlers: list[logging.Handler]):
+        super().__init__(log_queue)
+        self.handlers = handlers
+
+    def prepare(self, record: logging.LogRecord) -> tuple:
+        # Окончательно форматируют обработчики в потоке слушателя, у каждого
+        # свой формат. Но сообщение и трейсбек собираются сразу, как в
+        # QueueHandler: аргументы могут измениться после вызова, а exc_info
+        # держит кадры стека запроса, пока запись в очереди
+        record = copy.copy(record)
+        # AccessFormatter uvicorn берёт поля строки доступа из args, это
+        # неизменяемые строки и числа
+        if record.name != "uvicorn.access":
+            record.message = record.getMessage()
+            record.msg = record.message
+            record.args = None
+        if record.exc_info:
+            record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record, self.handlers
+
+    def enqueue(self, item: tuple) -> None:
+        if settings.log_queue_full == "block":
+            self.queue.put(item)
+            return
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+class HandlersQueueListener(QueueListener):
+    def handle(self, item: tuple) -> None:
+        record, handlers = item
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+_record_factory = logging.getLogRecordFactory()
+
+
+def _record_with_request_id(*args, **kwargs) -> logging.LogRecord:
+    # Запись создаётся в задаче запроса, а пишется в потоке слушателя,
+    # поэтому id берётся сразу
+    record = _record_factory(*args, **kwargs)
+    record.request_id = request_id.get()
+    return record
+
+
+def configure_logging() -> None:
+    """Настраивает логи по LOGGING.
+
+    Если задан log_queue_size, обработчики логгеров пишут в фоновом потоке,
+    а event loop только кладёт записи в очередь. Когда очередь полна,
+    запись отбрасывается или ждёт места (log_queue_full).
+    """
+    logging.setLogRecordFactory(_record_with_request_id)
+    logging.config.dictConfig(LOGGING)
+    if not settings.log_queue_size:
+        return
+
+    log_queue = queue.Queue(settings.log_queue_size)
+    for name in ["", *LOGGING["loggers"]]:
+        logger = logging.getLogger(name)
+        handlers = [h for h in logger.handlers if not isinstance(h, QueueHandler)]
+        if not handlers:
+            continue
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(BoundedQueueHandler(log_queue, handlers))
+
+    listener = HandlersQueueListener(log_queue)
+    listener.start()
+    # Дописать оставшиеся записи при завершении процесса
+    atexit.register(listener.stop)
+
+
+# Значения этих полей тела и query-параметров не попадают в лог
+SENSITIVE_FIELDS = frozenset(
+    {
+        "password",
+        "access_token",
+        "refresh_token",
+        "token",
+        "code",
+        "client_secret",
+    }
+)
+REDACTED = "***"
+
+request_logger = logging.getLogger("api.requests")
+
+
+def redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in SENSITIVE_FIELDS else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+async def _request_record(request: Request) -> bytes:
+    record = {
+        "method": request.method,
+        "path": request.url.path,
+        "query": redact(dict(request.query_params)),
+    }
+    body = await request.body()
+    if body:
+        try:
+            record["body"] = redact(orjson.loads(body))
+        except orjson.JSONDecodeError:
+            # Формы и прочее не разбираем, только размер
+            record["body_size"] = len(body)
+    return orjson.dumps(record)
+
+
 # По мотивам https://github.com/tiangolo/fastapi/issues/4683
 # https://fastapi.tiangolo.com/advanced/custom-request-and-route/
 class LoggingRoute(APIRoute):
+    """Пишет запросы в лог api.requests на уровне DEBUG одной строкой JSON.
+
+    На уровне INFO и выше тело запроса не читается, и обработка стоит
+    одной проверки уровня. Доля логируемых запросов -
+    request_log_sample_rate.
+    """
+
     def get_route_handler(self) -> Callable:
         original_route_handler = super().get_route_handler()
 
         async def custom_route_handler(request: Request) -> Response:
-            msg = f"{request.method} {request.url.path} {request.query_params}"
-            request_body = await request.body()
-            if request_body:
-                msg += f" {json.loads(request_body)}"
-            logging.debug(msg)
+            if request_logger.isEnabledFor(logging.DEBUG) and (
+                random.random() < settings.request_log_sample_rate  # noqa: S311
+            ):
+                request_logger.debug("%s", (await _request_record(request)).decode())
             return await original_route_handler(request)
 
         return custom_route_handler
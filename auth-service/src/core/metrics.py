@@ -0,0 +1,154 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Метрики под gunicorn с несколькими воркерами: каждый процесс пишет свои
+# значения в файлы в этой папке, /metrics любого воркера суммирует их.
+# Переменную читает prometheus_client при создании метрик.
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_CLIENT_REQUEST_SECONDS = Histogram(
+    "http_client_request_duration_seconds",
+    "Outbound HTTP request latency (OAuth providers) until response headers",
+    ["host", "status"],
+    buckets=(0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+DB_STATEMENT_SECONDS = Histogram(
+    "db_statement_seconds",
+    "SQL statement execution time by statement type",
+    ["database", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Time spent hashing or verifying a password in the hasher pool",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+PASSWORD_HASH_QUEUE_WAIT_SECONDS = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a password hashing task waited for a free hasher process",
+    ["operation"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Password hashing tasks submitted to the hasher pool and not yet finished",
+    multiprocess_mode="livesum",
+)
+
+DENYLIST_LOOKUPS = Counter(
+    "denylist_lookups_total",
+    "Denylist checks by the layer that answered them",
+    ["source"],
+)
+
+DB_POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the Postgres pool",
+    ["database"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Requests that got no Postgres connection within the pool timeout",
+    ["database"],
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Postgres connections currently checked out of the pool",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity",
+    "Maximum Postgres connections the pool can open (size plus overflow)",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+DB_REPLICA_FALLBACKS = Counter(
+    "db_replica_fallbacks_total",
+    "Reads repeated on the primary after failing on a replica",
+)
+
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_seconds",
+    "Redis command latency as seen by the client, pipelines as PIPELINE",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total",
+    "Log records dropped because the log queue was full",
+)
+
+
+class MetricsMiddleware:
+    """ASGI-middleware, замеряющее запросы по шаблону маршрута.
+
+    Шаблон ("/api/v1/roles/{role_id}") берётся из scope["route"], который
+    выставляет роутер FastAPI, поэтому число меток не зависит от путей.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"], _route_template(scope), status_code
+            ).observe(time.perf_counter() - started)
+
+
+def _route_template(scope: Scope) -> str:
+    if route := scope.get("route"):
+        return route.path
+    # Маршруты Starlette без параметров, вроде самого /metrics
+    if "endpoint" in scope:
+        return scope["path"]
+    return "unmatched"
+
+
+def metrics(request: Request) -> Response:
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
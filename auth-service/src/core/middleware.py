@@ -0,0 +1,58 @@
+from fastapi import status
+from fastapi.responses import ORJSONResponse
+from opentelemetry import trace
+from starlette.middleware.sessions import SessionMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from core.logging import LoggingRoute, request_id
+from core.settings import settings
+
+# /metrics опрашивает Prometheus напрямую, а не через nginx
+REQUEST_ID_EXEMPT_PATHS = {"/metrics"}
+
+
+class RequestIdMiddleware:
+    """Требует заголовок X-Request-Id от nginx.
+
+    Id попадает в логи запроса (request_id) и в атрибут текущего спана.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        value = None
+        for name, header in scope["headers"]:
+            if name == b"x-request-id":
+                value = header.decode("latin-1")
+                break
+        if not value:
+            if scope["path"] in REQUEST_ID_EXEMPT_PATHS:
+                return await self.app(scope, receive, send)
+            response = ORJSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": "X-Request-Id is required"},
+            )
+            return await response(scope, receive, send)
+
+        trace.get_current_span().set_attribute("http.request_id", value)
+        token = request_id.set(value)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_id.reset(token)
+
+
+class SessionRoute(LoggingRoute):
+    """Маршрут с подписанной cookie-сессией (request.session).
+
+    Сессия нужна только входу через соцсети, поэтому cookie разбирается
+    и подписывается в маршрутах с этим классом, а не в каждом запросе.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.app = SessionMiddleware(self.app, secret_key=settings.session_secret_key)
@@ -1,25 +1,68 @@
+from fastapi import FastAPI
 from opentelemetry import trace
 from opentelemetry.exporter.jaeger.thrift import JaegerExporter
+from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.instrumentation.redis import RedisInstrumentor
+from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, Sampler, TraceIdRatioBased
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from core.settings import settings
 
 
+def _sampler() -> Sampler:
+    sampler = TraceIdRatioBased(settings.tracer_sample_ratio)
+    if settings.tracer_sampler == "parentbased":
+        # Если вызывающий сервис передал traceparent, следуем его решению
+        return ParentBased(sampler)
+    return sampler
+
+
+def _exporter() -> SpanExporter:
+    if settings.tracer_exporter == "otlp":
+        return OTLPSpanExporter(endpoint=settings.otlp_endpoint, insecure=True)
+    return JaegerExporter(
+        agent_host_name=settings.jaeger_agent_host,
+        agent_port=settings.jaeger_agent_port,
+    )
+
+
+def _span_processor(exporter: SpanExporter) -> BatchSpanProcessor:
+    # Спаны сверх очереди отбрасываются, а не копятся в памяти
+    return BatchSpanProcessor(
+        exporter,
+        max_queue_size=settings.tracer_max_queue_size,
+        max_export_batch_size=settings.tracer_max_export_batch_size,
+        schedule_delay_millis=settings.tracer_schedule_delay_millis,
+    )
+
+
 def configure_tracer() -> None:
     resource = Resource(attributes={"service.name": "auth-service"})
-    trace.set_tracer_provider(TracerProvider(resource=resource))
-    trace.get_tracer_provider().add_span_processor(
-        BatchSpanProcessor(
-            JaegerExporter(
-                agent_host_name=settings.jaeger_agent_host,
-                agent_port=settings.jaeger_agent_port,
-            )
-        )
-    )
+    trace.set_tracer_provider(TracerProvider(resource=resource, sampler=_sampler()))
+    trace.get_tracer_provider().add_span_processor(_span_processor(_exporter()))
     if settings.log_level == "DEBUG":
         # Чтобы видеть трейсы в консоли
         trace.get_tracer_provider().add_span_processor(
-            BatchSpanProcessor(ConsoleSpanExporter())
+            _span_processor(ConsoleSpanExporter())
         )
+
+
+def instrument(app: FastAPI, engines: list[AsyncEngine]) -> None:
+    """Спаны запросов к API, SQL-запросов и команд Redis.
+
+    Запросы httpx к OAuth-провайдерам отмечает транспорт utils.http.client.
+    """
+    FastAPIInstrumentor.instrument_app(app)
+    SQLAlchemyInstrumentor().instrument(
+        engines=[engine.sync_engine for engine in engines]
+    )
+    RedisInstrumentor().instrument()
@@ -0,0 +1,340 @@
+import asyncio
+import heapq
+import logging
+import math
+import time
+from typing import Optional
+from uuid import UUID
+
+import orjson
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.metrics import DENYLIST_LOOKUPS
+from core.settings import settings
+from db.redis import AnyRedis, hash_tag
+from utils.bloom import TimeBucketedBloomFilter
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "denylist"
+# В Redis Cluster все ключи лежат в одном слоте, чтобы проверка пачки
+# токенов оставалась одним MGET. Обычно токены проверяются по копии в
+# памяти воркеров, так что нагрузка на этот узел небольшая.
+_TAG = hash_tag("denylist")
+# Отозванный jti - ключ с 16 байтами UUID и временем жизни, равным
+# оставшемуся времени жизни токена
+KEY_PREFIX = f"{_TAG}:jti:".encode()
+# Или поле в хеше, общем для токенов, истекающих в одну минуту
+BUCKET_PREFIX = f"{_TAG}:exp:".encode()
+# Поколение токенов пользователя: access-токены с поколением в claim "gen"
+# меньше текущего отозваны все сразу
+GENERATION_PREFIX = f"{_TAG}:gen:"
+# Новое поколение - время Redis в мс, но не меньше прежнего + 1. Ключ живёт
+# одно время жизни access-токена после отзыва, и счётчик с нуля после его
+# истечения повторил бы поколение токенов, выданных после прошлого отзыва.
+# Время растёт и после истечения ключа, поэтому поколение не повторяется.
+BUMP_GENERATION = """
+local now = redis.call('TIME')
+local value = math.max(
+    tonumber(redis.call('GET', KEYS[1]) or 0) + 1,
+    now[1] * 1000 + math.floor(now[2] / 1000)
+)
+redis.call('SET', KEYS[1], string.format('%d', value), 'EX', ARGV[1])
+return value
+"""
+# Как часто подписка проверяет соединение, если сообщений нет
+LISTEN_TIMEOUT = 5.0
+# Ключи до перехода на бинарный формат - сами jti в виде строки UUID,
+# см. settings.denylist_legacy_keys
+LEGACY_JTI_PATTERN = "-".join("?" * n for n in (8, 4, 4, 4, 12))
+
+
+def _bucket(exp: float) -> bytes:
+    return BUCKET_PREFIX + str(int(exp // 60)).encode()
+
+
+def _outdated(token: dict, generation: int) -> bool:
+    # Поколение есть только у access-токенов, refresh-токены отзываются
+    # вместе с сессией
+    return token["type"] == "access" and token.get("gen", 0) < generation
+
+
+class Denylist:
+    """Отозванные access-токены.
+
+    Источник истины - Redis, но каждый воркер держит копию в памяти:
+    отзыв публикуется в канал, воркеры подписаны на него и при каждой
+    (пере)подписке перечитывают список из Redis. Пока подписка жива и
+    копия не переполнена, проверка токена не ходит в сеть.
+
+    Точная копия ограничена по размеру, поэтому перед ней стоит
+    bloom-фильтр всех отозванных jti: если фильтр говорит "нет", в Redis
+    можно не ходить, даже когда часть записей вытеснена из памяти.
+
+    Чтобы отозвать все токены пользователя, достаточно увеличить его
+    поколение - это одна запись в Redis независимо от числа сессий.
+    """
+
+    def __init__(
+        self, redis: AnyRedis, max_entries: int, pubsub_redis: Optional[Redis] = None
+    ):
+        self.redis = redis
+        self.pubsub_redis = pubsub_redis or redis
+        self.max_entries = max_entries
+        self._entries: dict[bytes, float] = {}  # jti -> exp
+        self._expires: list[tuple[float, bytes]] = []
+        self._generations: dict[str, tuple[int, float]] = {}  # user -> gen, exp
+        self._synced = False
+        # До этого момента в памяти может не хватать вытесненных записей
+        self._incomplete_until = 0.0
+        self._bloom = TimeBucketedBloomFilter(
+            settings.denylist_bloom_capacity,
+            settings.denylist_bloom_error_rate,
+            settings.authjwt_access_token_expires.total_seconds(),
+        )
+        self._listener: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+
+    async def revoke(self, jti: str, exp: Optional[float]) -> None:
+        """Отзывает токен, истекающий в exp (unix time).
+
+        Если exp неизвестен, токен считается выданным только что.
+        """
+        now = time.time()
+        exact = exp is not None
+        if not exact:
+            exp = now + settings.authjwt_access_token_expires.total_seconds()
+        if exp <= now:
+            return
+
+        jti_bytes = UUID(jti).bytes
+        message = orjson.dumps({"jti": jti, "exp": exp})
+        async with self.redis.pipeline(transaction=False) as pipe:
+            # Корзину ищем по exp из токена, поэтому без точного exp - ключ
+            if settings.denylist_storage == "buckets" and exact:
+                bucket = _bucket(exp)
+                pipe.hset(bucket, jti_bytes, b"")
+                pipe.expireat(bucket, (int(exp // 60) + 1) * 60)
+            else:
+                pipe.set(KEY_PREFIX + jti_bytes, b"", px=math.ceil((exp - now) * 1000))
+            if settings.denylist_legacy_keys:
+                # Воркеры прежней версии ищут в Redis только такие ключи и
+                # считают токен отозванным по непустому значению (GET)
+                pipe.set(jti, b"revoked", px=math.ceil((exp - now) * 1000))
+            if self.pubsub_redis is self.redis:
+                pipe.publish(CHANNEL, message)
+            await pipe.execute()
+        if self.pubsub_redis is not self.redis:
+            # В кластере публикуем через клиент узла, см. db.redis.pubsub_redis
+            await self.pubsub_redis.publish(CHANNEL, message)
+        # Своему воркеру не нужно ждать сообщения из канала
+        self._add(jti_bytes, exp)
+
+    async def revoke_user(self, user_id: str) -> None:
+        ttl = int(settings.authjwt_access_token_expires.total_seconds())
+        key = GENERATION_PREFIX + user_id
+        # Ключ живёт, пока живы токены, выданные до последнего отзыва
+        generation = await self.redis.eval(BUMP_GENERATION, 1, key, ttl)
+        exp = time.time() + ttl
+        await self.pubsub_redis.publish(
+            CHANNEL,
+            orjson.dumps({"user": user_id, "generation": generation, "exp": exp}),
+        )
+        self._set_generation(user_id, generation, exp)
+
+    async def generation(self, user_id: str) -> int:
+        if self._synced:
+            return self._get_generation(user_id, time.time())
+        return int(await self.redis.get(GENERATION_PREFIX + user_id) or 0)
+
+    async def is_revoked(self, token: dict) -> bool:
+        return (await self.are_revoked([token]))[0]
+
+    async def are_revoked(self, tokens: list[dict]) -> list[bool]:
+        """Проверяет несколько токенов, в Redis - не больше одного запроса."""
+        now = time.time()
+        synced = self._synced
+        verdicts = [self._check_local(token, now, synced) for token in tokens]
+        unknown = [i for i, verdict in enumerate(verdicts) if verdict is None]
+        if not unknown:
+            return verdicts
+
+        DENYLIST_LOOKUPS.labels("redis").inc(len(unknown))
+        jtis = [UUID(tokens[i]["jti"]).bytes for i in unknown]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.mget([KEY_PREFIX + jti for jti in jtis])
+            if not synced:
+                pipe.mget([GENERATION_PREFIX + tokens[i]["sub"] for i in unknown])
+            if settings.denylist_legacy_keys:
+                # Без хеш-тега: в кластере ключи в разных слотах, MGET нельзя
+                for i in unknown:
+                    pipe.exists(tokens[i]["jti"])
+            if settings.denylist_storage == "buckets":
+                for i, jti in zip(unknown, jtis):
+                    pipe.hexists(_bucket(tokens[i]["exp"]), jti)
+            results = await pipe.execute()
+
+        keys = results.pop(0)
+        generations = None if synced else results.pop(0)
+        if settings.denylist_legacy_keys:
+            legacy = results[: len(unknown)]
+            del results[: len(unknown)]
+        else:
+            legacy = [0] * len(unknown)
+        # Остались HEXISTS по корзинам, если они есть
+        in_buckets = results or [False] * len(unknown)
+        for n, i in enumerate(unknown):
+            revoked = keys[n] is not None or bool(legacy[n]) or bool(in_buckets[n])
+            if not synced:
+                revoked = revoked or _outdated(tokens[i], int(generations[n] or 0))
+            verdicts[i] = revoked
+        return verdicts
+
+    def _check_local(self, token: dict, now: float, synced: bool) -> Optional[bool]:
+        """Проверка по памяти воркера, None - нужно спросить Redis."""
+        jti = UUID(token["jti"]).bytes
+        exp = self._entries.get(jti)
+        if exp is not None and exp > now:
+            DENYLIST_LOOKUPS.labels("memory").inc()
+            return True
+
+        if not synced:
+            return None
+        if _outdated(token, self._get_generation(token["sub"], now)):
+            DENYLIST_LOOKUPS.labels("memory").inc()
+            return True
+        if settings.denylist_legacy_keys:
+            # Воркеры прежней версии не публикуют отзывы в канал, их ключи
+            # видны только в Redis
+            return None
+        if now >= self._incomplete_until:
+            DENYLIST_LOOKUPS.labels("memory").inc()
+            return False
+        if not self._bloom.might_contain(jti, now):
+            DENYLIST_LOOKUPS.labels("bloom").inc()
+            return False
+        return None
+
+    def _add(self, jti: bytes, exp: float) -> None:
+        now = time.time()
+        while self._expires and self._expires[0][0] <= now:
+            self._pop()
+        self._bloom.expire(now)
+        if exp <= now or self._entries.get(jti, 0) >= exp:
+            return
+        self._bloom.add(jti, exp)
+        self._entries[jti] = exp
+        heapq.heappush(self._expires, (exp, jti))
+        while len(self._entries) > self.max_entries:
+            evicted_exp = self._pop()
+            self._incomplete_until = max(self._incomplete_until, evicted_exp)
+
+    def _pop(self) -> float:
+        exp, jti = heapq.heappop(self._expires)
+        if self._entries.get(jti) == exp:
+            del self._entries[jti]
+        return exp
+
+    def _get_generation(self, user_id: str, now: float) -> int:
+        generation, exp = self._generations.get(user_id, (0, 0))
+        return generation if exp > now else 0
+
+    def _set_generation(self, user_id: str, generation: int, exp: float) -> None:
+        # Отзыв всех токенов - редкая операция, поэтому заодно чистим
+        # истёкшие поколения полным проходом
+        now = time.time()
+        for expired in [u for u, (_, e) in self._generations.items() if e <= now]:
+            del self._generations[expired]
+        if generation > self._get_generation(user_id, now):
+            self._generations[user_id] = (generation, exp)
+
+    async def _load(self) -> None:
+        self._synced = False
+        self._entries.clear()
+        self._expires.clear()
+        self._bloom.clear()
+        self._generations.clear()
+        self._incomplete_until = 0.0
+
+        patterns = [(KEY_PREFIX + b"*", lambda key: key[len(KEY_PREFIX) :])]
+        if settings.denylist_legacy_keys:
+            patterns.append((LEGACY_JTI_PATTERN, lambda key: UUID(key.decode()).bytes))
+        for pattern, to_jti in patterns:
+            keys = [key async for key in self.redis.scan_iter(pattern, count=1000)]
+            for start in range(0, len(keys), 1000):
+                chunk = keys[start : start + 1000]
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for key in chunk:
+                        pipe.pttl(key)
+                    ttls = await pipe.execute()
+                now = time.time()
+                for key, ttl in zip(chunk, ttls):
+                    if ttl > 0:
+                        self._add(to_jti(key), now + ttl / 1000)
+
+        async for bucket in self.redis.scan_iter(BUCKET_PREFIX + b"*", count=100):
+            # Точный exp в корзине не хранится, берём конец её минуты
+            exp = (int(bucket[len(BUCKET_PREFIX) :]) + 1) * 60
+            async for jti, _ in self.redis.hscan_iter(bucket, count=1000):
+                self._add(jti, exp)
+
+        async for key in self.redis.scan_iter(GENERATION_PREFIX + "*", count=1000):
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                generation, ttl = await pipe.execute()
+            if generation and ttl > 0:
+                user_id = key.decode().removeprefix(GENERATION_PREFIX)
+                self._set_generation(user_id, int(generation), time.time() + ttl / 1000)
+
+        logger.info(
+            "Denylist loaded: %d revoked tokens, %d revoked users",
+            len(self._entries),
+            len(self._generations),
+        )
+
+    async def _handle(self, message: dict) -> None:
+        if message["type"] == "subscribe":
+            # Подписка уже активна, поэтому отзывы, сделанные
+            # во время загрузки, не потеряются
+            await self._load()
+            self._synced = True
+        elif message["type"] == "message":
+            data = orjson.loads(message["data"])
+            if "jti" in data:
+                self._add(UUID(data["jti"]).bytes, data["exp"])
+            else:
+                self._set_generation(data["user"], data["generation"], data["exp"])
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.pubsub_redis.pubsub() as pubsub:
+                    await pubsub.subscribe(CHANNEL)
+                    while True:
+                        # Ждём с таймаутом, а не listen(): иначе сработает
+                        # socket_timeout клиента, а проверки соединения
+                        # по health_check_interval не будет
+                        message = await pubsub.get_message(timeout=LISTEN_TIMEOUT)
+                        if message:
+                            await self._handle(message)
+            except (RedisError, OSError) as e:
+                logger.warning("Denylist subscription lost: %s", e)
+            finally:
+                self._synced = False
+            await asyncio.sleep(1)
+
+
+denylist: Optional[Denylist] = None
+
+
+async def get_denylist() -> Denylist:
+    return denylist
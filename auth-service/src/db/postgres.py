@@ -1,16 +1,212 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+import itertools
+import logging
+import time
+from functools import wraps
+from typing import Optional
+from uuid import UUID, uuid4
 
+from asyncpg import Connection
+from sqlalchemy import event
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from core.metrics import (
+    DB_POOL_CAPACITY,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT_SECONDS,
+    DB_REPLICA_FALLBACKS,
+    DB_STATEMENT_SECONDS,
+)
 from core.settings import settings
+from db import redis
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
-engine = create_async_engine(
-    settings.postgres_dsn, echo=settings.postgres_echo, future=True
+STICKY_PREFIX = "db:primary:"
+
+
+class MeasuredQueuePool(AsyncAdaptedQueuePool):
+    """Пул, замеряющий ожидание свободного соединения.
+
+    Метрики размечены именем базы из pool_logging_name.
+    """
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.labels(self.logging_name).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT_SECONDS.labels(self.logging_name).observe(
+                time.perf_counter() - started
+            )
+
+
+class PgBouncerConnection(Connection):
+    """Соединение asyncpg для PgBouncer в режиме transaction.
+
+    Имена подготовленных запросов asyncpg берёт из счётчика процесса, и у
+    разных воркеров они совпадают. PgBouncer может выполнить запрос на
+    серверном соединении другого воркера, где такое имя уже занято.
+    """
+
+    def _get_unique_id(self, prefix: str) -> str:
+        return f"__asyncpg_{prefix}_{uuid4().hex}__"
+
+
+def _connect_args() -> dict:
+    if not settings.postgres_pgbouncer:
+        return {}
+    return {
+        "connection_class": PgBouncerConnection,
+        # Кеш asyncpg и кеш диалекта SQLAlchemy
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+    }
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, *args):
+    context.started = time.perf_counter()
+
+
+def _create_engine(dsn: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        dsn,
+        echo=settings.postgres_echo,
+        future=True,
+        poolclass=MeasuredQueuePool,
+        pool_logging_name=name,
+        pool_size=settings.postgres_pool_size,
+        max_overflow=settings.postgres_max_overflow,
+        pool_timeout=settings.postgres_pool_timeout,
+        pool_recycle=settings.postgres_pool_recycle,
+        pool_pre_ping=settings.postgres_pool_pre_ping,
+        connect_args=_connect_args(),
+    )
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, *args):
+        operation = statement.lstrip().split(None, 1)[0].upper()
+        DB_STATEMENT_SECONDS.labels(name, operation).observe(
+            time.perf_counter() - context.started
+        )
+
+    event.listen(
+        engine.sync_engine.pool,
+        "checkout",
+        lambda *args: DB_POOL_CHECKED_OUT.labels(name).inc(),
+    )
+    event.listen(
+        engine.sync_engine.pool,
+        "checkin",
+        lambda *args: DB_POOL_CHECKED_OUT.labels(name).dec(),
+    )
+    DB_POOL_CAPACITY.labels(name).set(
+        settings.postgres_pool_size + settings.postgres_max_overflow
+    )
+    return engine
+
+
+engine = _create_engine(settings.postgres_dsn, "primary")
+replica_engines = [
+    _create_engine(dsn, f"replica{i}")
+    for i, dsn in enumerate(settings.postgres_replica_dsns)
+]
+_next_replica = itertools.cycle(replica_engines)
+
+
+class RoutingSession(Session):
+    """Сессия, которая внутри read_only-методов читает из реплики."""
+
+    replica: Optional[AsyncEngine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self.replica and not self._flushing:
+            return self.replica.sync_engine
+        return engine.sync_engine
+
+
+async_session = sessionmaker(
+    engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
 )
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
 async def get_session() -> AsyncSession:
     async with async_session() as session:
         yield session
+
+
+async def stick_to_primary(key: UUID | str) -> None:
+    """Отправляет чтения пользователя в основную базу после его записи.
+
+    key - id пользователя или аргумент методов с read_only(retry_empty=True).
+    """
+    if replica_engines and settings.postgres_replica_sticky_seconds:
+        await redis.redis.set(
+            STICKY_PREFIX + str(key),
+            1,
+            px=int(settings.postgres_replica_sticky_seconds * 1000),
+        )
+
+
+def read_only(func=None, *, retry_empty: bool = False):
+    """Выполняет метод сервиса на реплике по кругу, если они настроены.
+
+    Метод должен только читать: при ошибке реплики он выполняется заново
+    на основной базе. Если недавно писал пользователь уже проверенного
+    токена из service.auth_jwt, метод сразу читает с основной базы.
+    retry_empty перечитывает с основной базы пустой результат, если
+    stick_to_primary недавно вызывали с первым аргументом метода
+    (например, email при входе сразу после регистрации).
+    """
+    if func is None:
+        return lambda func: read_only(func, retry_empty=retry_empty)
+
+    @wraps(func)
+    async def wrapper(service, *args, **kwargs):
+        session: RoutingSession = service.db.sync_session
+        if not replica_engines or session.replica or await _is_sticky(service):
+            return await func(service, *args, **kwargs)
+
+        session.replica = next(_next_replica)
+        try:
+            result = await func(service, *args, **kwargs)
+            if result or not retry_empty or not await _is_written(args[0]):
+                return result
+        except (SQLAlchemyError, OSError) as e:
+            logger.warning("Read on %r failed: %r", session.replica.url, e)
+            DB_REPLICA_FALLBACKS.inc()
+        finally:
+            session.replica = None
+        # Соединение реплики больше не нужно этой сессии
+        await service.db.rollback()
+        return await func(service, *args, **kwargs)
+
+    return wrapper
+
+
+async def _is_sticky(service) -> bool:
+    # Только уже проверенный токен: разбор заголовка здесь превратил бы
+    # ошибку в нём в 422 там, где токен не нужен (например, /login)
+    auth_jwt = getattr(service, "auth_jwt", None)
+    claims = auth_jwt and auth_jwt.verified_access_claims
+    return bool(claims) and await _is_written(claims.sub)
+
+
+async def _is_written(key: str) -> bool:
+    """Вызывали ли недавно stick_to_primary(key)."""
+    if not settings.postgres_replica_sticky_seconds:
+        return False
+    return bool(await redis.redis.exists(STICKY_PREFIX + key))
@@ -1,9 +1,148 @@
-from typing import Optional
+import time
+from typing import Optional, Union
 
-from redis.asyncio import Redis
+from redis.asyncio import BlockingConnectionPool, Redis, RedisCluster
+from redis.asyncio.client import Pipeline
+from redis.asyncio.cluster import ClusterPipeline
+from redis.asyncio.connection import parse_url
+from redis.asyncio.sentinel import Sentinel
+from redis.exceptions import RedisClusterException
 
-redis: Optional[Redis] = None
+from core.metrics import REDIS_COMMAND_SECONDS
+from core.settings import settings
 
+# Инкремент счётчика с временем жизни одной атомарной командой,
+# MULTI в Redis Cluster недоступен
+INCR_EXPIRE = """
+local value = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return value
+"""
 
-async def get_redis() -> Redis:
+
+class _MeasuredCommands:
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_SECONDS.labels(args[0]).observe(time.perf_counter() - started)
+
+
+class MeasuredPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_SECONDS.labels("PIPELINE").observe(
+                time.perf_counter() - started
+            )
+
+
+class MeasuredRedis(_MeasuredCommands, Redis):
+    """Redis, замеряющий время каждой команды и конвейера."""
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> Pipeline:
+        return MeasuredPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class MeasuredClusterPipeline(ClusterPipeline):
+    async def execute(self, raise_on_error: bool = True, allow_redirections=True):
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error, allow_redirections)
+        finally:
+            REDIS_COMMAND_SECONDS.labels("PIPELINE").observe(
+                time.perf_counter() - started
+            )
+
+
+class MeasuredRedisCluster(_MeasuredCommands, RedisCluster):
+    def pipeline(self, transaction=None, shard_hint=None) -> ClusterPipeline:
+        if transaction or shard_hint:
+            raise RedisClusterException("Transactions are not supported in cluster")
+        return MeasuredClusterPipeline(self)
+
+
+AnyRedis = Union[Redis, RedisCluster]
+
+redis: Optional[AnyRedis] = None
+# Клиент для подписки на каналы. У RedisCluster её нет, но PUBLISH
+# в кластере доходит до всех узлов, поэтому достаточно одного узла.
+pubsub_redis: Optional[Redis] = None
+
+
+def hash_tag(name: str) -> str:
+    """Префикс ключей, которые в Redis Cluster должны лежать в одном слоте.
+
+    Тогда MGET и скрипты по этим ключам работают так же, как без кластера.
+    """
+    if settings.redis_mode == "cluster":
+        return "{" + name + "}"
+    return name
+
+
+def _options() -> dict:
+    url = parse_url(settings.redis_dsn)
+    return {
+        "username": url.get("username"),
+        "password": url.get("password"),
+        "max_connections": settings.redis_max_connections,
+        "socket_timeout": settings.redis_socket_timeout,
+        "socket_connect_timeout": settings.redis_socket_connect_timeout,
+        "health_check_interval": settings.redis_health_check_interval,
+    }
+
+
+def create_redis() -> AnyRedis:
+    """Клиент Redis по redis_mode.
+
+    Соединений в пуле не больше redis_max_connections: при медленном Redis
+    запросы ждут свободное соединение (standalone) или сразу получают
+    ошибку, а не открывают новые соединения.
+    """
+    if settings.redis_mode == "cluster":
+        return MeasuredRedisCluster.from_url(settings.redis_dsn, **_options())
+
+    if settings.redis_mode == "sentinel":
+        # Адрес мастера спрашиваем у sentinel, из DSN берём пароль и номер базы
+        sentinels = []
+        for address in settings.redis_sentinels:
+            host, port = address.rsplit(":", 1)
+            sentinels.append((host, int(port)))
+        sentinel = Sentinel(
+            sentinels, sentinel_kwargs={"socket_timeout": settings.redis_socket_timeout}
+        )
+        return sentinel.master_for(
+            settings.redis_sentinel_master,
+            redis_class=MeasuredRedis,
+            db=parse_url(settings.redis_dsn).get("db", 0),
+            **_options(),
+        )
+
+    pool = BlockingConnectionPool.from_url(
+        settings.redis_dsn, timeout=settings.redis_pool_timeout, **_options()
+    )
+    return MeasuredRedis(connection_pool=pool)
+
+
+async def create_pubsub_redis(client: AnyRedis) -> Redis:
+    if not isinstance(client, RedisCluster):
+        return client
+    await client.initialize()
+    node = client.get_default_node()
+    return Redis(host=node.host, port=node.port, **_options())
+
+
+async def close_redis(client: AnyRedis) -> None:
+    if isinstance(client, RedisCluster):
+        await client.close()
+    else:
+        await client.close(close_connection_pool=True)
+
+
+async def get_redis() -> AnyRedis:
     return redis
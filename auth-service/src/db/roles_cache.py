@@ -0,0 +1,63 @@
+from typing import Optional
+
+import orjson
+
+from core.settings import settings
+from db.redis import INCR_EXPIRE, AnyRedis, hash_tag
+
+# В Redis Cluster ключи в одном слоте, чтобы читать запись и версии одним MGET
+_TAG = hash_tag("roles")
+USER_PREFIX = f"{_TAG}:user:"
+# Переименование или удаление роли затрагивает всех её владельцев, поэтому
+# вместо удаления их записей увеличиваем общую версию кеша
+VERSION_KEY = f"{_TAG}:version"
+USER_VERSION_PREFIX = f"{_TAG}:version:"
+
+
+class RolesCache:
+    """Имена ролей пользователя для claim "roles".
+
+    Запись хранит версии (общую и пользователя), при которых роли были
+    прочитаны из базы. Версии берутся до чтения, поэтому изменение ролей,
+    закоммиченное во время чтения, не даст сохранить устаревший список.
+    """
+
+    def __init__(self, redis: AnyRedis):
+        self.redis = redis
+
+    async def get(self, user_id: str) -> tuple[Optional[list[str]], list[int]]:
+        """Возвращает роли (None, если их нет в кеше) и текущие версии."""
+        cached, *versions = await self.redis.mget(
+            USER_PREFIX + user_id, VERSION_KEY, USER_VERSION_PREFIX + user_id
+        )
+        versions = [int(version or 0) for version in versions]
+        if not cached:
+            return None, versions
+        data = orjson.loads(cached)
+        if data["versions"] != versions:
+            return None, versions
+        return data["roles"], versions
+
+    async def set(self, user_id: str, roles: list[str], versions: list[int]) -> None:
+        await self.redis.set(
+            USER_PREFIX + user_id,
+            orjson.dumps({"versions": versions, "roles": roles}),
+            ex=settings.roles_cache_ttl,
+        )
+
+    async def invalidate_user(self, user_id: str) -> None:
+        # Версия нужна, пока может жить запись, прочитанная до неё,
+        # а она могла быть сохранена чуть позже
+        await self.redis.eval(
+            INCR_EXPIRE, 1, USER_VERSION_PREFIX + user_id, settings.roles_cache_ttl * 2
+        )
+
+    async def invalidate_all(self) -> None:
+        await self.redis.incr(VERSION_KEY)
+
+
+roles_cache: Optional[RolesCache] = None
+
+
+async def get_roles_cache() -> RolesCache:
+    return roles_cache
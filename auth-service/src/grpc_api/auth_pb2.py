@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: grpc_api/auth.proto
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13grpc_api/auth.proto\x12\x07\x61uth.v1\"6\n\x10\x41uthorizeRequest\x12\r\n\x05token\x18\x01 \x01(\t\x12\x13\n\x0b\x61llow_roles\x18\x02 \x03(\t\"8\n\x11\x41uthorizeResponse\x12\x13\n\x0bstatus_code\x18\x01 \x01(\x05\x12\x0e\n\x06\x64\x65tail\x18\x02 \x01(\t2\x96\x01\n\x04\x41uth\x12\x42\n\tAuthorize\x12\x19.auth.v1.AuthorizeRequest\x1a\x1a.auth.v1.AuthorizeResponse\x12J\n\rAuthorizeMany\x12\x19.auth.v1.AuthorizeRequest\x1a\x1a.auth.v1.AuthorizeResponse(\x01\x30\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'grpc_api.auth_pb2', _globals)
+if _descriptor._USE_C_DESCRIPTORS == False:
+  DESCRIPTOR._options = None
+  _globals['_AUTHORIZEREQUEST']._serialized_start=32
+  _globals['_AUTHORIZEREQUEST']._serialized_end=86
+  _globals['_AUTHORIZERESPONSE']._serialized_start=88
+  _globals['_AUTHORIZERESPONSE']._serialized_end=144
+  _globals['_AUTH']._serialized_start=147
+  _globals['_AUTH']._serialized_end=297
+# @@protoc_insertion_point(module_scope)
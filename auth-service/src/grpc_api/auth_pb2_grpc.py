@@ -0,0 +1,101 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from grpc_api import auth_pb2 as grpc__api_dot_auth__pb2
+
+
+class AuthStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Authorize = channel.unary_unary(
+                '/auth.v1.Auth/Authorize',
+                request_serializer=grpc__api_dot_auth__pb2.AuthorizeRequest.SerializeToString,
+                response_deserializer=grpc__api_dot_auth__pb2.AuthorizeResponse.FromString,
+                )
+        self.AuthorizeMany = channel.stream_stream(
+                '/auth.v1.Auth/AuthorizeMany',
+                request_serializer=grpc__api_dot_auth__pb2.AuthorizeRequest.SerializeToString,
+                response_deserializer=grpc__api_dot_auth__pb2.AuthorizeResponse.FromString,
+                )
+
+
+class AuthServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def Authorize(self, request, context):
+        """То же, что GET /api/v1/check_access
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def AuthorizeMany(self, request_iterator, context):
+        """Проверки одним потоком, ответы приходят в порядке запросов
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_AuthServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'Authorize': grpc.unary_unary_rpc_method_handler(
+                    servicer.Authorize,
+                    request_deserializer=grpc__api_dot_auth__pb2.AuthorizeRequest.FromString,
+                    response_serializer=grpc__api_dot_auth__pb2.AuthorizeResponse.SerializeToString,
+            ),
+            'AuthorizeMany': grpc.stream_stream_rpc_method_handler(
+                    servicer.AuthorizeMany,
+                    request_deserializer=grpc__api_dot_auth__pb2.AuthorizeRequest.FromString,
+                    response_serializer=grpc__api_dot_auth__pb2.AuthorizeResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'auth.v1.Auth', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Auth(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def Authorize(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/auth.v1.Auth/Authorize',
+            grpc__api_dot_auth__pb2.AuthorizeRequest.SerializeToString,
+            grpc__api_dot_auth__pb2.AuthorizeResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def AuthorizeMany(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(request_iterator, target, '/auth.v1.Auth/AuthorizeMany',
+            grpc__api_dot_auth__pb2.AuthorizeRequest.SerializeToString,
+            grpc__api_dot_auth__pb2.AuthorizeResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -0,0 +1,132 @@
+"""gRPC-сервис проверки токенов.
+
+Запускается в процессе API при ENABLE_GRPC=true (каждый воркер gunicorn
+слушает GRPC_PORT через SO_REUSEPORT) или отдельным процессом:
+
+python -m grpc_api.server
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+
+import grpc
+import typer
+
+from core import jwt
+from core.jwt import AuthJWT
+from core.logging import configure_logging
+from core.settings import settings
+from db import denylist, redis
+from grpc_api import auth_pb2, auth_pb2_grpc
+from schemas.auth import TokenCheck
+from services.auth import verify_tokens
+
+logger = logging.getLogger(__name__)
+
+server: Optional[grpc.aio.Server] = None
+
+
+class AuthServicer(auth_pb2_grpc.AuthServicer):
+    async def _verify(
+        self, requests: list[auth_pb2.AuthorizeRequest]
+    ) -> list[auth_pb2.AuthorizeResponse]:
+        # Свой AuthJWT на вызов: он запоминает проверенные токены
+        checks = [
+            TokenCheck.construct(
+                token=request.token, allow_roles=list(request.allow_roles) or None
+            )
+            for request in requests
+        ]
+        verdicts = await verify_tokens(AuthJWT(), denylist.denylist, checks)
+        return [
+            auth_pb2.AuthorizeResponse(
+                status_code=verdict.status_code, detail=verdict.detail or ""
+            )
+            for verdict in verdicts
+        ]
+
+    async def Authorize(
+        self, request: auth_pb2.AuthorizeRequest, context: grpc.aio.ServicerContext
+    ) -> auth_pb2.AuthorizeResponse:
+        [response] = await self._verify([request])
+        return response
+
+    async def AuthorizeMany(
+        self,
+        request_iterator: AsyncIterator[auth_pb2.AuthorizeRequest],
+        context: grpc.aio.ServicerContext,
+    ) -> AsyncIterator[auth_pb2.AuthorizeResponse]:
+        # Запросы, пришедшие пока проверялась предыдущая пачка, проверяются
+        # вместе: подпись по одной, отзыв одним вызовом are_revoked. Клиент,
+        # который ждёт ответа перед следующим запросом, получает его сразу
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def read() -> None:
+            try:
+                async for request in request_iterator:
+                    queue.put_nowait(request)
+            finally:
+                queue.put_nowait(None)
+
+        reader = asyncio.create_task(read())
+        try:
+            while (request := await queue.get()) is not None:
+                batch = [request]
+                while (
+                    len(batch) < settings.check_access_batch_max_tokens
+                    and not queue.empty()
+                ):
+                    request = queue.get_nowait()
+                    if request is None:
+                        # Конец потока обработаем на следующей итерации
+                        queue.put_nowait(None)
+                        break
+                    batch.append(request)
+                for response in await self._verify(batch):
+                    yield response
+            # Ошибка чтения потока
+            await reader
+        finally:
+            reader.cancel()
+
+
+async def start_server() -> grpc.aio.Server:
+    grpc_server = grpc.aio.server(options=[("grpc.so_reuseport", 1)])
+    auth_pb2_grpc.add_AuthServicer_to_server(AuthServicer(), grpc_server)
+    grpc_server.add_insecure_port(f"[::]:{settings.grpc_port}")
+    await grpc_server.start()
+    logger.info("gRPC server listening on port %s", settings.grpc_port)
+    return grpc_server
+
+
+async def serve() -> None:
+    # То же окружение, что у API в main.startup, без Postgres
+    AuthJWT.load_config(lambda: settings)
+    jwt.keyset = jwt.KeySet.load(
+        settings.authjwt_keys_dir, settings.authjwt_signing_kid
+    )
+    redis.redis = redis.create_redis()
+    redis.pubsub_redis = await redis.create_pubsub_redis(redis.redis)
+    denylist.denylist = denylist.Denylist(
+        redis.redis, settings.denylist_cache_max_entries, redis.pubsub_redis
+    )
+    denylist.denylist.start()
+
+    grpc_server = await start_server()
+    try:
+        await grpc_server.wait_for_termination()
+    finally:
+        await grpc_server.stop(settings.grpc_shutdown_grace)
+        await denylist.denylist.stop()
+        if redis.pubsub_redis is not redis.redis:
+            await redis.close_redis(redis.pubsub_redis)
+        await redis.close_redis(redis.redis)
+
+
+def main():
+    configure_logging()
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    typer.run(main)
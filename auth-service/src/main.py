@@ -1,24 +1,30 @@
-import logging.config
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
 
-from async_fastapi_jwt_auth import AuthJWT
 from async_fastapi_jwt_auth.exceptions import AuthJWTException
 from fastapi import Depends, FastAPI, Request, status
 from fastapi.responses import ORJSONResponse
 from fastapi_limiter import FastAPILimiter
 from fastapi_limiter.depends import RateLimiter
 from httpx import AsyncClient as HttpxAsyncClient
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from redis.asyncio import Redis
-from starlette.middleware.sessions import SessionMiddleware
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
+from api import auth_request, well_known
 from api.v1 import auth, registration, roles, sessions, social, user, users
-from core.logging import LOGGING
+from core import jwt
+from core.jwt import AuthJWT
+from core.logging import configure_logging
+from core.metrics import MetricsMiddleware, metrics
+from core.middleware import RequestIdMiddleware
 from core.settings import settings
-from core.tracing import configure_tracer
-from db import redis
-from utils import http
+from core.tracing import configure_tracer, instrument
+from db import denylist, postgres, redis, roles_cache
+from grpc_api import server as grpc_server
+from utils import http, password
 
-logging.config.dictConfig(LOGGING)
+configure_logging()
 
 dependencies = []
 if settings.enable_rate_limiter:
@@ -37,37 +43,53 @@ app = FastAPI(
     default_response_class=ORJSONResponse,
     dependencies=dependencies,
 )
-app.add_middleware(SessionMiddleware, secret_key=settings.session_secret_key)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
+# Вне роутеров FastAPI: без общих зависимостей (rate limiter) и OpenAPI
+app.add_route("/metrics", metrics, include_in_schema=False)
+app.add_route("/internal/authorize", auth_request.authorize, include_in_schema=False)
 
 if settings.enable_tracer:
     configure_tracer()
-    FastAPIInstrumentor.instrument_app(app)
+    instrument(app, [postgres.engine, *postgres.replica_engines])
 
 
 @app.on_event("startup")
 async def startup():
-    redis.redis = Redis.from_url(settings.redis_dsn)
-    http.client = HttpxAsyncClient()
+    jwt.keyset = jwt.KeySet.load(
+        settings.authjwt_keys_dir, settings.authjwt_signing_kid
+    )
+    redis.redis = redis.create_redis()
+    redis.pubsub_redis = await redis.create_pubsub_redis(redis.redis)
+    http.client = HttpxAsyncClient(transport=http.create_transport())
+    password.executor = ProcessPoolExecutor(
+        max_workers=settings.password_hasher_workers, mp_context=get_context("spawn")
+    )
     await FastAPILimiter.init(redis.redis)
+    roles_cache.roles_cache = roles_cache.RolesCache(redis.redis)
+    denylist.denylist = denylist.Denylist(
+        redis.redis, settings.denylist_cache_max_entries, redis.pubsub_redis
+    )
+    denylist.denylist.start()
+    if settings.enable_grpc:
+        grpc_server.server = await grpc_server.start_server()
 
 
 @app.on_event("shutdown")
 async def shutdown():
-    await redis.redis.close()
+    if grpc_server.server:
+        await grpc_server.server.stop(settings.grpc_shutdown_grace)
+    await denylist.denylist.stop()
+    if redis.pubsub_redis is not redis.redis:
+        await redis.close_redis(redis.pubsub_redis)
+    await redis.close_redis(redis.redis)
     await http.client.aclose()
+    password.executor.shutdown(cancel_futures=True)
+    for engine in [postgres.engine, *postgres.replica_engines]:
+        await engine.dispose()
 
 
-@app.middleware("http")
-async def before_request(request: Request, call_next):
-    request_id = request.headers.get("X-Request-Id")
-    if not request_id:
-        return ORJSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={"detail": "X-Request-Id is required"},
-        )
-    return await call_next(request)
-
-
+app.include_router(well_known.router, prefix="/.well-known", tags=["Ключи"])
 app.include_router(registration.router, prefix="/api/v1", tags=["Регистрация"])
 app.include_router(auth.router, prefix="/api/v1", tags=["Авторизация"])
 app.include_router(social.router, prefix="/api/v1", tags=["Соцсети"])
@@ -89,6 +111,25 @@ def authjwt_exception_handler(request: Request, exc: AuthJWTException):
     return ORJSONResponse(status_code=exc.status_code, content={"detail": exc.message})
 
 
+@app.exception_handler(PoolTimeoutError)
+def pool_timeout_exception_handler(request: Request, exc: PoolTimeoutError):
+    # Все соединения пула заняты дольше POSTGRES_POOL_TIMEOUT
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database is overloaded"},
+    )
+
+
+@app.exception_handler(RedisConnectionError)
+@app.exception_handler(RedisTimeoutError)
+def redis_exception_handler(request: Request, exc: Exception):
+    # Redis не отвечает или все соединения пула заняты дольше REDIS_POOL_TIMEOUT
+    return ORJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Redis is unavailable"},
+    )
+
+
 @AuthJWT.token_in_denylist_loader
 async def check_if_token_in_denylist(decrypted_token):
-    return await redis.redis.get(decrypted_token["jti"])
+    return await denylist.denylist.is_revoked(decrypted_token)
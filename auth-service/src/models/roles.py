@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, String
+from sqlalchemy import Column, ForeignKey, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -11,7 +11,7 @@ class Role(IdMixin, TimestampMixin, Base):
 
     name = Column(String(255), unique=True, nullable=False)
 
-    users = relationship("UserRole", back_populates="role", lazy="selectin")
+    users = relationship("UserRole", back_populates="role", lazy="raise")
 
     def __repr__(self) -> str:
         return f"<Role {self.name}>"
@@ -27,5 +27,10 @@ class UserRole(IdMixin, TimestampMixin, Base):
         UUID(as_uuid=True), ForeignKey("roles.id", ondelete="CASCADE"), nullable=False
     )
 
-    role = relationship("Role", back_populates="users", lazy="selectin")
-    user = relationship("User", back_populates="roles", lazy="selectin")
+    role = relationship("Role", back_populates="users", lazy="raise")
+    user = relationship("User", back_populates="roles", lazy="raise")
+
+    __table_args__ = (
+        Index("ix_user_roles_user_id_role_id", "user_id", "role_id", unique=True),
+        Index("ix_user_roles_role_id", "role_id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 
 from db.postgres import Base
@@ -13,5 +13,16 @@ class Session(IdMixin, TimestampMixin, Base):
     )
     user_agent = Column(Text)
     access_jti = Column(UUID(as_uuid=True))
+    access_exp = Column(DateTime)
     refresh_jti = Column(UUID(as_uuid=True))
     session_exp = Column(DateTime)
+
+    __table_args__ = (
+        # Список сессий пользователя, от новых к старым
+        Index(
+            "ix_sessions_user_id_created_at_id",
+            "user_id",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+    )
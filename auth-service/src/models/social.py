@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Index, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 
 from db.postgres import Base
@@ -14,7 +14,10 @@ class SocialAccount(IdMixin, TimestampMixin, Base):
     social_id = Column(Text, nullable=False)
     social_name = Column(Text, nullable=False)
 
-    __table_args__ = (UniqueConstraint("social_id", "social_name", name="social_pk"),)
+    __table_args__ = (
+        UniqueConstraint("social_id", "social_name", name="social_pk"),
+        Index("ix_social_account_user_id", "user_id"),
+    )
 
     def __repr__(self):
         return f"<SocialAccount {self.social_name}:{self.user_id}>"
@@ -1,7 +1,5 @@
-from pydantic import EmailStr
 from sqlalchemy import Column, String
 from sqlalchemy.orm import relationship
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from db.postgres import Base
 from models.mixins import IdMixin, TimestampMixin
@@ -15,15 +13,9 @@ class User(IdMixin, TimestampMixin, Base):
     password_hash = Column(String(255), nullable=False)
     name = Column(String(255))
 
-    roles = relationship("UserRole", back_populates="user", lazy="selectin")
-
-    def __init__(self, email: EmailStr, password: str, name: str) -> None:
-        self.email = email
-        self.password_hash = generate_password_hash(password)
-        self.name = name
-
-    def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+    # Связи не загружаются неявно: если они нужны, запрос подгружает их
+    # сам через selectinload
+    roles = relationship("UserRole", back_populates="user", lazy="raise")
 
     def __repr__(self) -> str:
         return f"<User {self.email}>"
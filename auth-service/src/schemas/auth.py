@@ -1,7 +1,9 @@
+from typing import Literal, Optional
 from uuid import UUID
 
 from pydantic import Field
 
+from core.settings import settings
 from schemas.base import OrjsonBaseModel
 
 
@@ -17,3 +19,26 @@ class TokenPair(OrjsonBaseModel):
 
 class LoginResponse(TokenPair):
     user_id: UUID
+
+
+class TokenCheck(OrjsonBaseModel):
+    token: str = Field(title="Access-токен", min_length=1)
+    allow_roles: Optional[list[Literal["admin", "subscriber"]]] = Field(
+        title="Кому доступно"
+    )
+
+
+class TokenBatch(OrjsonBaseModel):
+    tokens: list[TokenCheck] = Field(
+        min_items=1, max_items=settings.check_access_batch_max_tokens
+    )
+
+
+class TokenVerdict(OrjsonBaseModel):
+    # Код, который вернул бы check_access для этого токена
+    status_code: int
+    detail: Optional[str]
+
+
+class TokenBatchResponse(OrjsonBaseModel):
+    verdicts: list[TokenVerdict]
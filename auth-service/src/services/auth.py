@@ -1,49 +1,68 @@
 import logging
 from datetime import datetime
-from functools import lru_cache
 from typing import Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from async_fastapi_jwt_auth import AuthJWT
+from async_fastapi_jwt_auth.exceptions import AuthJWTException, MissingTokenError
 from fastapi import Depends, HTTPException, status
-from redis.asyncio import Redis
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.settings import settings
-from db.postgres import get_session
-from db.redis import get_redis
+from core.jwt import AuthJWT
+from db.denylist import Denylist, get_denylist
+from db.postgres import get_session, read_only, stick_to_primary
+from db.roles_cache import RolesCache, get_roles_cache
+from models.roles import Role, UserRole
 from models.sessions import Session
 from models.users import User
-from schemas.auth import Credentials, LoginResponse, TokenPair
+from schemas.auth import Credentials, LoginResponse, TokenCheck, TokenPair, TokenVerdict
+from utils.password import verify_password
+from utils.tokens import mint_token
 
 logger = logging.getLogger(__name__)
 
 
 class AuthService:
-    def __init__(self, db: AsyncSession, redis: Redis, auth_jwt: AuthJWT):
+    def __init__(
+        self,
+        db: AsyncSession,
+        denylist: Denylist,
+        roles_cache: RolesCache,
+        auth_jwt: AuthJWT,
+    ):
         self.db = db
-        self.redis = redis
+        self.denylist = denylist
+        self.roles_cache = roles_cache
         self.auth_jwt = auth_jwt
 
+    @read_only(retry_empty=True)
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        result = await self.db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+
     async def get_user(self, credentials: Credentials) -> Optional[User]:
-        result = await self.db.execute(
-            select(User).where(User.email == credentials.username)
-        )
-        user = result.scalars().first()
-        if not user or not user.check_password(credentials.password):
+        user = await self.get_user_by_email(credentials.username)
+        if not user or not await verify_password(
+            user.password_hash, credentials.password
+        ):
             return None
         return user
 
     async def login(
         self, user: User, user_agent: Optional[str]
     ) -> Optional[LoginResponse]:
-        session = Session(user_id=user.id, user_agent=user_agent)
-        self.db.add(session)
+        # Идентификаторы известны заранее, поэтому сессия записывается
+        # одним INSERT уже с jti выданных токенов
+        session_id = uuid4()
+        tokens, token_claims = await self.create_token_pair(user.id, session_id)
+        self.db.add(
+            Session(
+                id=session_id, user_id=user.id, user_agent=user_agent, **token_claims
+            )
+        )
         await self.db.commit()
-        await self.db.refresh(session)
+        await stick_to_primary(user.id)
 
-        tokens = await self.create_token_pair(user, session.id)
         return LoginResponse(
             user_id=user.id,
             access_token=tokens.access_token,
@@ -51,8 +70,8 @@ class AuthService:
         )
 
     async def logout(self) -> None:
-        access_jwt = await self.auth_jwt.get_raw_jwt()
-        await self.end_session(access_jwt["session_id"], "logout")
+        claims = await self.auth_jwt.access_claims()
+        await self.end_session(claims.session_id, "logout")
 
     async def refresh_tokens(self, refresh_token: str) -> Optional[TokenPair]:
         refresh_jwt = await self.auth_jwt.get_raw_jwt(refresh_token)
@@ -69,10 +88,17 @@ class AuthService:
             await self.end_session(session.id, "refresh")
             return None
 
-        await self.revoke_access_token(session.access_jti, "refresh")
+        await self.revoke_access_token(
+            session.access_jti, session.access_exp, "refresh"
+        )
 
-        user = await self.db.get(User, session.user_id)
-        return await self.create_token_pair(user, session.id)
+        tokens, token_claims = await self.create_token_pair(session.user_id, session.id)
+        await self.db.execute(
+            update(Session).where(Session.id == session.id).values(token_claims)
+        )
+        await self.db.commit()
+        await stick_to_primary(session.user_id)
+        return tokens
 
     async def end_session(self, session_id: UUID, reason: str):
         result = await self.db.execute(
@@ -85,62 +111,130 @@ class AuthService:
 
         session = result.first()
         if session:
-            await self.revoke_access_token(session.access_jti, reason)
+            await stick_to_primary(session.user_id)
+        if session and session.access_jti:
+            await self.revoke_access_token(
+                session.access_jti, session.access_exp, reason
+            )
 
-    async def revoke_access_token(self, jti: UUID, reason: str):
-        await self.redis.setex(str(jti), settings.authjwt_access_token_expires, reason)
+    async def revoke_access_token(
+        self, jti: UUID, exp: Optional[datetime], reason: str
+    ):
+        await self.denylist.revoke(str(jti), exp.timestamp() if exp else None)
+        logger.debug("Access token %s revoked: %s", jti, reason)
 
     async def revoke_all_access_tokens(self, user_id: UUID, reason: str):
-        result = await self.db.execute(
-            select(Session).where(Session.user_id == user_id)
-        )
-        for session in result.scalars().all():
-            await self.revoke_access_token(session.access_jti, reason)
-
-    async def create_token_pair(self, user: User, session_id: UUID) -> TokenPair:
-        roles = [user_role.role.name for user_role in user.roles]
-        access_token = await self.auth_jwt.create_access_token(
-            subject=str(user.id),
-            user_claims={"session_id": str(session_id), "roles": roles},
-        )
-        refresh_token = await self.auth_jwt.create_refresh_token(
-            subject=str(user.id), user_claims={"session_id": str(session_id)}
-        )
-        refresh_jwt = await self.auth_jwt.get_raw_jwt(refresh_token)
-
-        statement = (
-            update(Session)
-            .where(Session.id == session_id)
-            .values(
-                {
-                    "access_jti": await self.auth_jwt.get_jti(access_token),
-                    "refresh_jti": refresh_jwt["jti"],
-                    "session_exp": datetime.fromtimestamp(refresh_jwt["exp"]),
-                }
+        await self.denylist.revoke_user(str(user_id))
+        logger.info("Access tokens of user %s revoked: %s", user_id, reason)
+
+    async def get_roles(self, user_id: UUID) -> list[str]:
+        roles, versions = await self.roles_cache.get(str(user_id))
+        if roles is None:
+            result = await self.db.execute(
+                select(Role.name)
+                .join(UserRole, UserRole.role_id == Role.id)
+                .where(UserRole.user_id == user_id)
             )
+            roles = result.scalars().all()
+            await self.roles_cache.set(str(user_id), roles, versions)
+        return roles
+
+    async def create_token_pair(
+        self, user_id: UUID, session_id: UUID
+    ) -> tuple[TokenPair, dict]:
+        """Выпускает пару токенов и значения полей сессии для них."""
+        access = await mint_token(
+            self.auth_jwt,
+            "access",
+            str(user_id),
+            {
+                "session_id": str(session_id),
+                "roles": await self.get_roles(user_id),
+                "gen": await self.denylist.generation(str(user_id)),
+            },
+        )
+        refresh = await mint_token(
+            self.auth_jwt, "refresh", str(user_id), {"session_id": str(session_id)}
         )
-        await self.db.execute(statement)
-        await self.db.commit()
 
-        return TokenPair(access_token=access_token, refresh_token=refresh_token)
+        token_claims = {
+            "access_jti": access.jti,
+            "access_exp": datetime.fromtimestamp(access.exp),
+            "refresh_jti": refresh.jti,
+            "session_exp": datetime.fromtimestamp(refresh.exp),
+        }
+        tokens = TokenPair(access_token=access.token, refresh_token=refresh.token)
+        return tokens, token_claims
 
     async def check_access(self, allow_roles: list[str] = None) -> None:
-        await self.auth_jwt.jwt_required()
-
-        if allow_roles is None:
-            return
+        token = self.auth_jwt.request_token
+        if not token:
+            raise MissingTokenError(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                message="Missing Authorization Header",
+            )
+        [verdict] = await verify_tokens(
+            self.auth_jwt,
+            self.denylist,
+            [TokenCheck.construct(token=token, allow_roles=allow_roles)],
+        )
+        if verdict.status_code != status.HTTP_204_NO_CONTENT:
+            raise HTTPException(status_code=verdict.status_code, detail=verdict.detail)
+        # Сервисы дальше берут claims без повторной проверки отзыва
+        self.auth_jwt.remember_access_claims(
+            await self.auth_jwt.decode_access_token(token)
+        )
 
-        access_jwt = await self.auth_jwt.get_raw_jwt()
-        if not set(allow_roles) & set(access_jwt["roles"]):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions"
+    async def check_access_batch(self, checks: list[TokenCheck]) -> list[TokenVerdict]:
+        return await verify_tokens(self.auth_jwt, self.denylist, checks)
+
+
+def has_role(roles: list[str], allow_roles: Optional[list[str]]) -> bool:
+    return allow_roles is None or bool(set(allow_roles) & set(roles))
+
+
+async def verify_tokens(
+    auth_jwt: AuthJWT, denylist: Denylist, checks: list[TokenCheck]
+) -> list[TokenVerdict]:
+    """Проверяет access-токены: подпись, issuer и тип, отзыв, роли.
+
+    Не требует сессии БД: общая часть check_access, check_access/batch,
+    auth_request и gRPC-сервиса. Отзыв всех токенов проверяется одним
+    вызовом denylist.are_revoked.
+    """
+    verdicts: list[Optional[TokenVerdict]] = []
+    decoded = []  # номер проверки, claims
+    for check in checks:
+        try:
+            access_jwt = await auth_jwt.decode_access_token(check.token)
+        except AuthJWTException as e:
+            verdicts.append(TokenVerdict(status_code=e.status_code, detail=e.message))
+            continue
+        decoded.append((len(verdicts), access_jwt))
+        verdicts.append(None)
+
+    # Отзыв проверяется сразу для всех токенов
+    revoked = await denylist.are_revoked([claims for _, claims in decoded])
+    for (i, access_jwt), is_revoked in zip(decoded, revoked):
+        if is_revoked:
+            verdicts[i] = TokenVerdict(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+            )
+        elif not has_role(access_jwt["roles"], checks[i].allow_roles):
+            verdicts[i] = TokenVerdict(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Insufficient permissions",
             )
+        else:
+            verdicts[i] = TokenVerdict(status_code=status.HTTP_204_NO_CONTENT)
+    return verdicts
 
 
-@lru_cache()
-def get_auth_service(
+async def get_auth_service(
     db: AsyncSession = Depends(get_session),
-    redis: Redis = Depends(get_redis),
+    denylist: Denylist = Depends(get_denylist),
+    roles_cache: RolesCache = Depends(get_roles_cache),
     auth_jwt: AuthJWT = Depends(),
 ) -> AuthService:
-    return AuthService(db, redis, auth_jwt)
+    return AuthService(db, denylist, roles_cache, auth_jwt)
@@ -1,5 +1,4 @@
 import logging
-from functools import lru_cache
 
 import httpx
 from fastapi import Depends, status
@@ -56,8 +55,7 @@ class GoogleService:
         return await self.social_service.get_user(social_id, "google", email, name)
 
 
-@lru_cache()
-def get_google_service(
+async def get_google_service(
     http_client: httpx.AsyncClient = Depends(get_http_client),
     social_service: SocialService = Depends(get_social_service),
 ) -> GoogleService:
@@ -1,5 +1,4 @@
 import logging
-from functools import lru_cache
 from typing import Optional
 from uuid import UUID
 
@@ -8,7 +7,9 @@ from fastapi.encoders import jsonable_encoder
 from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.postgres import get_session
+from core.jwt import AuthJWT
+from db.postgres import get_session, read_only, stick_to_primary
+from db.roles_cache import RolesCache, get_roles_cache
 from models.roles import Role
 from schemas.roles import RoleBase, RoleResponse
 
@@ -16,9 +17,12 @@ logger = logging.getLogger(__name__)
 
 
 class RoleService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, roles_cache: RolesCache, auth_jwt: AuthJWT):
         self.db = db
+        self.roles_cache = roles_cache
+        self.auth_jwt = auth_jwt
 
+    @read_only
     async def list_roles(self) -> list[RoleResponse]:
         result = await self.db.execute(select(Role))
         return result.scalars().all()
@@ -31,7 +35,10 @@ class RoleService:
         role = Role(**jsonable_encoder(role_create))
         self.db.add(role)
         await self.db.commit()
-        await self.db.refresh(role)
+        # Таблицу ролей с реплик читает только администратор (list_roles).
+        # Роли пользователя для токенов AuthService.get_roles читает с
+        # основной базы, поэтому закреплять всех пользователей не нужно
+        await stick_to_primary((await self.auth_jwt.access_claims()).sub)
         return role
 
     async def patch_role(
@@ -42,16 +49,21 @@ class RoleService:
             update(Role).where(Role.id == role_id).values(**values).returning(Role)
         )
         await self.db.commit()
+        await stick_to_primary((await self.auth_jwt.access_claims()).sub)
+        await self.roles_cache.invalidate_all()
         return result.first()
 
     async def delete_role(self, role_id: UUID) -> bool:
         result = await self.db.execute(delete(Role).where(Role.id == role_id))
         await self.db.commit()
+        await stick_to_primary((await self.auth_jwt.access_claims()).sub)
+        await self.roles_cache.invalidate_all()
         return result.rowcount
 
 
-@lru_cache()
-def get_role_service(
+async def get_role_service(
     db: AsyncSession = Depends(get_session),
+    roles_cache: RolesCache = Depends(get_roles_cache),
+    auth_jwt: AuthJWT = Depends(),
 ) -> RoleService:
-    return RoleService(db)
+    return RoleService(db, roles_cache, auth_jwt)
@@ -1,15 +1,16 @@
+import base64
 import logging
-from datetime import datetime
-from functools import lru_cache
+from datetime import datetime, timezone
 from typing import Optional
 from uuid import UUID
 
-from async_fastapi_jwt_auth import AuthJWT
+import orjson
 from fastapi import Depends
-from sqlalchemy import or_, select
+from sqlalchemy import or_, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.postgres import get_session
+from core.jwt import AuthJWT
+from db.postgres import get_session, read_only
 from models.sessions import Session
 from schemas.sessions import SessionResponse
 from services.auth import AuthService, get_auth_service
@@ -17,16 +18,45 @@ from services.auth import AuthService, get_auth_service
 logger = logging.getLogger(__name__)
 
 
+def encode_cursor(session: Session) -> str:
+    data = orjson.dumps([session.created_at.isoformat(), str(session.id)])
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Разбирает курсор, при ошибке - ValueError."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, session_id = orjson.loads(data)
+        created_at = datetime.fromisoformat(created_at)
+        # created_at хранится в UTC без часового пояса
+        if created_at.tzinfo:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        return created_at, UUID(session_id)
+    except (ValueError, TypeError, OverflowError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
 class SessionService:
     def __init__(self, db: AsyncSession, auth_jwt: AuthJWT, auth_service: AuthService):
         self.db = db
         self.auth_jwt = auth_jwt
         self.auth_service = auth_service
 
+    @read_only
     async def list_user_sessions(
-        self, active: Optional[bool], page_size: int, page_number: int
-    ) -> list[SessionResponse]:
-        user_id = await self.auth_jwt.get_jwt_subject()
+        self,
+        active: Optional[bool],
+        page_size: int,
+        page_number: int,
+        cursor: Optional[str] = None,
+    ) -> tuple[list[SessionResponse], Optional[str]]:
+        """Возвращает страницу сессий и курсор следующей страницы.
+
+        С курсором страница читается по индексу сразу после сессии из
+        курсора, page_number игнорируется.
+        """
+        user_id = (await self.auth_jwt.access_claims()).sub
         filters = [Session.user_id == user_id]
 
         if active:
@@ -39,17 +69,27 @@ class SessionService:
         elif active is not None:
             filters.append(Session.session_exp < datetime.utcnow())
 
-        result = await self.db.execute(
+        query = (
             select(Session)
-            .where(*filters)
-            .order_by(Session.created_at.desc())
+            .order_by(Session.created_at.desc(), Session.id.desc())
             .limit(page_size)
-            .offset(page_size * (page_number - 1))
         )
-        return result.scalars().all()
+        if cursor:
+            filters.append(
+                tuple_(Session.created_at, Session.id) < decode_cursor(cursor)
+            )
+        else:
+            query = query.offset(page_size * (page_number - 1))
+
+        result = await self.db.execute(query.where(*filters))
+        sessions = result.scalars().all()
+        next_cursor = (
+            encode_cursor(sessions[-1]) if len(sessions) == page_size else None
+        )
+        return sessions, next_cursor
 
     async def end_user_session(self, session_id: UUID) -> bool:
-        user_id = await self.auth_jwt.get_jwt_subject()
+        user_id = (await self.auth_jwt.access_claims()).sub
         result = await self.db.execute(
             select(Session).where(Session.user_id == user_id, Session.id == session_id)
         )
@@ -62,8 +102,7 @@ class SessionService:
         return True
 
 
-@lru_cache()
-def get_session_service(
+async def get_session_service(
     db: AsyncSession = Depends(get_session),
     auth_jwt: AuthJWT = Depends(),
     auth_service: AuthService = Depends(get_auth_service),
@@ -1,5 +1,4 @@
 import logging
-from functools import lru_cache
 
 from fastapi import Depends
 from pydantic import EmailStr
@@ -9,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from db.postgres import get_session
 from models.social import SocialAccount
 from models.users import User
+from utils.password import hash_password
 from utils.random import generate_random_string
 
 logger = logging.getLogger(__name__)
@@ -38,10 +38,13 @@ class SocialService:
         user = result.scalars().first()
 
         if not user:
-            user = User(email, generate_random_string(16), name)
+            user = User(
+                email=email,
+                password_hash=await hash_password(generate_random_string(16)),
+                name=name,
+            )
             self.db.add(user)
             await self.db.commit()
-            await self.db.refresh(user)
 
         social_account = SocialAccount(
             user_id=user.id,
@@ -54,8 +57,7 @@ class SocialService:
         return user
 
 
-@lru_cache()
-def get_social_service(
+async def get_social_service(
     db: AsyncSession = Depends(get_session),
 ) -> SocialService:
     return SocialService(db)
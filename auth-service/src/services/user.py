@@ -1,18 +1,17 @@
 import logging
-from functools import lru_cache
 from typing import Optional
 
-from async_fastapi_jwt_auth import AuthJWT
 from fastapi import Depends
 from fastapi.encoders import jsonable_encoder
 from pydantic import EmailStr
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from werkzeug.security import generate_password_hash
 
-from db.postgres import get_session
+from core.jwt import AuthJWT
+from db.postgres import get_session, read_only, stick_to_primary
 from models.users import User
 from schemas.users import UserCreate, UserPatch, UserResponse
+from utils.password import hash_password
 
 logger = logging.getLogger(__name__)
 
@@ -27,31 +26,35 @@ class UserService:
         return result.scalars().first()
 
     async def create_user(self, user_create: UserCreate) -> UserResponse:
-        user = User(**jsonable_encoder(user_create))
+        values = jsonable_encoder(user_create)
+        values["password_hash"] = await hash_password(values.pop("password"))
+        user = User(**values)
         self.db.add(user)
         await self.db.commit()
-        await self.db.refresh(user)
+        # Вход сразу после регистрации ищет пользователя по email
+        await stick_to_primary(user.email)
         return user
 
+    @read_only
     async def get_current_user(self) -> Optional[UserResponse]:
-        user_id = await self.auth_jwt.get_jwt_subject()
+        user_id = (await self.auth_jwt.access_claims()).sub
         result = await self.db.execute(select(User).where(User.id == user_id))
         return result.scalars().first()
 
     async def patch_current_user(self, user_patch: UserPatch) -> Optional[UserResponse]:
-        user_id = await self.auth_jwt.get_jwt_subject()
+        user_id = (await self.auth_jwt.access_claims()).sub
         values = jsonable_encoder(user_patch, exclude_unset=True)
         if password := values.pop("password", None):
-            values["password_hash"] = generate_password_hash(password)
+            values["password_hash"] = await hash_password(password)
         result = await self.db.execute(
             update(User).where(User.id == user_id).values(**values).returning(User)
         )
         await self.db.commit()
+        await stick_to_primary(user_id)
         return result.first()
 
 
-@lru_cache()
-def get_user_service(
+async def get_user_service(
     db: AsyncSession = Depends(get_session), auth_jwt: AuthJWT = Depends()
 ) -> UserService:
     return UserService(db, auth_jwt)
@@ -1,12 +1,13 @@
 import logging
-from functools import lru_cache
 from uuid import UUID
 
 from fastapi import Depends
 from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.postgres import get_session
+from db.postgres import get_session, stick_to_primary
+from db.roles_cache import RolesCache, get_roles_cache
 from models.roles import Role, UserRole
 from models.users import User
 from services.auth import AuthService, get_auth_service
@@ -15,8 +16,11 @@ logger = logging.getLogger(__name__)
 
 
 class UserRoleService:
-    def __init__(self, db: AsyncSession, auth_service: AuthService):
+    def __init__(
+        self, db: AsyncSession, roles_cache: RolesCache, auth_service: AuthService
+    ):
         self.db = db
+        self.roles_cache = roles_cache
         self.auth_service = auth_service
 
     async def get_user_by_id(self, user_id: UUID) -> User:
@@ -27,19 +31,20 @@ class UserRoleService:
         result = await self.db.execute(select(Role).where(Role.id == role_id))
         return result.scalars().first()
 
-    async def get_user_role(self, user_id: UUID, role_id: UUID) -> UserRole:
-        result = await self.db.execute(
-            select(UserRole).where(
-                UserRole.user_id == user_id, UserRole.role_id == role_id
-            )
-        )
-        return result.scalars().first()
-
-    async def create_user_role(self, user_id: UUID, role_id: UUID) -> None:
+    async def create_user_role(self, user_id: UUID, role_id: UUID) -> bool:
         user_role = UserRole(user_id=user_id, role_id=role_id)
         self.db.add(user_role)
-        await self.db.commit()
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            # Роль уже выдана - см. ix_user_roles_user_id_role_id
+            await self.db.rollback()
+            return False
+        # Изменились роли пользователя, а не администратора
+        await stick_to_primary(user_id)
+        await self.roles_cache.invalidate_user(str(user_id))
         await self.auth_service.revoke_all_access_tokens(user_id, "add_role")
+        return True
 
     async def delete_user_role(self, user_id: UUID, role_id: UUID) -> bool:
         result = await self.db.execute(
@@ -48,13 +53,15 @@ class UserRoleService:
             )
         )
         await self.db.commit()
+        await stick_to_primary(user_id)
+        await self.roles_cache.invalidate_user(str(user_id))
         await self.auth_service.revoke_all_access_tokens(user_id, "delete_role")
         return result.rowcount
 
 
-@lru_cache()
-def get_user_role_service(
+async def get_user_role_service(
     db: AsyncSession = Depends(get_session),
+    roles_cache: RolesCache = Depends(get_roles_cache),
     auth_service: AuthService = Depends(get_auth_service),
 ) -> UserRoleService:
-    return UserRoleService(db, auth_service)
+    return UserRoleService(db, roles_cache, auth_service)
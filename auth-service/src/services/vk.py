@@ -1,5 +1,4 @@
 import logging
-from functools import lru_cache
 
 import httpx
 from fastapi import Depends, status
@@ -62,8 +61,7 @@ class VKService:
             return ""
 
 
-@lru_cache()
-def get_vk_service(
+async def get_vk_service(
     http_client: httpx.AsyncClient = Depends(get_http_client),
     social_service: SocialService = Depends(get_social_service),
 ) -> VKService:
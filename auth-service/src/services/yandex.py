@@ -1,5 +1,4 @@
 import logging
-from functools import lru_cache
 
 import httpx
 from fastapi import Depends, status
@@ -56,8 +55,7 @@ class YandexService:
         )
 
 
-@lru_cache()
-def get_yandex_service(
+async def get_yandex_service(
     social_service: SocialService = Depends(get_social_service),
     http_client: httpx.AsyncClient = Depends(get_http_client),
 ) -> YandexService:
@@ -0,0 +1,92 @@
+import math
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, item: bytes) -> list[int]:
+        # Двойное хеширование (Kirsch-Mitzenmacher) вместо k хеш-функций.
+        # Фильтр не покидает процесс, поэтому хватает встроенного hash().
+        h = hash(item) & 0xFFFFFFFFFFFFFFFF
+        position, step = (h & 0xFFFFFFFF) % self.size, (h >> 32) % self.size or 1
+        positions = []
+        for _ in range(self.hash_count):
+            positions.append(position)
+            position = (position + step) % self.size
+        return positions
+
+    def add(self, item: bytes) -> None:
+        for position in self.positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def contains(self, positions: list[int]) -> bool:
+        bits = self._bits
+        for position in positions:
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __contains__(self, item: bytes) -> bool:
+        return self.contains(self.positions(item))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class TimeBucketedBloomFilter:
+    """Bloom-фильтр для элементов с временем жизни.
+
+    Элементы раскладываются по корзинам по времени истечения, корзина
+    целиком удаляется, когда истекли все её элементы. Все фильтры
+    одного размера, поэтому позиции битов считаются один раз на запрос.
+    Если корзина заполнена, в неё добавляется ещё один фильтр.
+    """
+
+    def __init__(
+        self, capacity: int, error_rate: float, lifetime: float, buckets: int = 4
+    ):
+        self.bucket_width = lifetime / buckets
+        # Ошибка складывается по всем фильтрам, которые проверяются
+        self._capacity = math.ceil(capacity / buckets)
+        self._error_rate = error_rate / (buckets + 1)
+        self._template = BloomFilter(self._capacity, self._error_rate)
+        self._buckets: dict[int, list[BloomFilter]] = {}
+
+    def add(self, item: bytes, exp: float) -> None:
+        filters = self._buckets.setdefault(int(exp // self.bucket_width), [])
+        if not filters or filters[-1].count >= filters[-1].capacity:
+            filters.append(BloomFilter(self._capacity, self._error_rate))
+        filters[-1].add(item)
+
+    def might_contain(self, item: bytes, now: float) -> bool:
+        positions = self._template.positions(item)
+        for bucket, filters in self._buckets.items():
+            if (bucket + 1) * self.bucket_width <= now:
+                continue
+            for bloom in filters:
+                if bloom.contains(positions):
+                    return True
+        return False
+
+    def expire(self, now: float) -> None:
+        current = int(now // self.bucket_width)
+        for bucket in [bucket for bucket in self._buckets if bucket < current]:
+            del self._buckets[bucket]
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            bloom.nbytes for filters in self._buckets.values() for bloom in filters
+        )
@@ -1,9 +1,38 @@
+import time
 from typing import Optional
 
-from httpx import AsyncClient
+from httpx import AsyncBaseTransport, AsyncClient, AsyncHTTPTransport, Request, Response
+from opentelemetry.instrumentation.httpx import AsyncOpenTelemetryTransport
+
+from core.metrics import HTTP_CLIENT_REQUEST_SECONDS
+from core.settings import settings
 
 client: Optional[AsyncClient] = None
 
 
+class MeasuredTransport(AsyncHTTPTransport):
+    """Транспорт httpx, замеряющий запросы к внешним сервисам по хосту."""
+
+    async def handle_async_request(self, request: Request) -> Response:
+        started = time.perf_counter()
+        status_code = "error"
+        try:
+            response = await super().handle_async_request(request)
+            status_code = response.status_code
+            return response
+        finally:
+            HTTP_CLIENT_REQUEST_SECONDS.labels(request.url.host, status_code).observe(
+                time.perf_counter() - started
+            )
+
+
+def create_transport() -> AsyncBaseTransport:
+    transport = MeasuredTransport()
+    if settings.enable_tracer:
+        # Спан на каждый запрос к внешнему сервису
+        transport = AsyncOpenTelemetryTransport(transport)
+    return transport
+
+
 async def get_http_client() -> AsyncClient:
     return client
@@ -0,0 +1,63 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from core.metrics import (
+    PASSWORD_HASH_QUEUE_DEPTH,
+    PASSWORD_HASH_QUEUE_WAIT_SECONDS,
+    PASSWORD_HASH_SECONDS,
+)
+from core.settings import settings
+
+# Пул процессов для PBKDF2, создаётся при старте приложения.
+# Если пул не создан (например, в CLI), хеширование идёт в пуле потоков
+# event loop по умолчанию.
+executor: Optional[Executor] = None
+
+_pending = 0
+
+
+def _timed(func: Callable, *args):
+    # Выполняется в процессе пула, поэтому время считаем там же,
+    # чтобы отделить ожидание в очереди от самого хеширования.
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+async def _run(operation: str, func: Callable, *args):
+    global _pending
+    if _pending >= settings.password_hasher_max_queue:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Password hasher is overloaded",
+        )
+
+    _pending += 1
+    PASSWORD_HASH_QUEUE_DEPTH.inc()
+    started = time.perf_counter()
+    try:
+        result, elapsed = await asyncio.get_running_loop().run_in_executor(
+            executor, _timed, func, *args
+        )
+    finally:
+        _pending -= 1
+        PASSWORD_HASH_QUEUE_DEPTH.dec()
+
+    PASSWORD_HASH_SECONDS.labels(operation).observe(elapsed)
+    PASSWORD_HASH_QUEUE_WAIT_SECONDS.labels(operation).observe(
+        time.perf_counter() - started - elapsed
+    )
+    return result
+
+
+async def hash_password(password: str) -> str:
+    return await _run("hash", generate_password_hash, password)
+
+
+async def verify_password(password_hash: str, password: str) -> bool:
+    return await _run("verify", check_password_hash, password_hash, password)
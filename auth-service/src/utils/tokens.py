@@ -0,0 +1,46 @@
+import time
+from typing import Literal, NamedTuple
+from uuid import UUID, uuid4
+
+from core.jwt import AuthJWT
+from core.settings import settings
+
+
+class MintedToken(NamedTuple):
+    token: str
+    jti: UUID
+    exp: int
+
+
+async def mint_token(
+    auth_jwt: AuthJWT,
+    type_token: Literal["access", "refresh"],
+    subject: str,
+    user_claims: dict,
+) -> MintedToken:
+    """Подписывает токен и возвращает его вместе с jti и exp.
+
+    Зарезервированные claims считаются здесь и передаются в user_claims,
+    которые библиотека кладёт в токен поверх своих, поэтому выпущенный
+    токен не нужно декодировать, чтобы узнать его jti и exp.
+    """
+    if type_token == "access":  # noqa: S105
+        create = auth_jwt.create_access_token
+        expires = settings.authjwt_access_token_expires
+    else:
+        create = auth_jwt.create_refresh_token
+        expires = settings.authjwt_refresh_token_expires
+    now = int(time.time())
+    jti = uuid4()
+    exp = now + int(expires.total_seconds())
+    token = await create(
+        subject=subject,
+        user_claims={
+            "jti": str(jti),
+            "iat": now,
+            "nbf": now,
+            "exp": exp,
+            **user_claims,
+        },
+    )
+    return MintedToken(token, jti, exp)
@@ -58,6 +58,16 @@ async def check_access(make_request):
     return inner
 
 
+@pytest.fixture
+async def check_access_batch(make_request):
+    async def inner(tokens: list[dict]) -> dict:
+        return await make_request(
+            hdrs.METH_POST, "/api/v1/check_access/batch", json={"tokens": tokens}
+        )
+
+    return inner
+
+
 @pytest.fixture
 async def list_user_sessions(make_request):
     async def inner(token: str = None, params: dict = {}) -> dict:
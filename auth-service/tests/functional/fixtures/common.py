@@ -1,4 +1,6 @@
 import asyncio
+import base64
+import json
 
 import pytest
 from aiohttp import ClientSession
@@ -41,3 +43,14 @@ def make_request(aiohttp_session: ClientSession):
             }
 
     return inner
+
+
+@pytest.fixture
+def decode_token():
+    """Возвращает claims токена без проверки подписи."""
+
+    def inner(token: str) -> dict:
+        payload = token.split(".")[1]
+        return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+
+    return inner
@@ -1,6 +1,7 @@
 from uuid import uuid4
 
 import pytest
+from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from sqlalchemy.sql import text
@@ -51,7 +52,7 @@ async def admin_role(db: AsyncSession) -> dict:
 
 
 @pytest.fixture
-async def add_role(db: AsyncSession):
+async def add_role(db: AsyncSession, redis_client: Redis):
     async def inner(user_id: str, role_id: str):
         await db.execute(
             text(
@@ -60,5 +61,7 @@ async def add_role(db: AsyncSession):
             ).bindparams(id=uuid4(), user_id=user_id, role_id=role_id)
         )
         await db.commit()
+        # Как при выдаче роли через API: закешированные роли устарели
+        await redis_client.incr(f"roles:version:{user_id}")
 
     return inner
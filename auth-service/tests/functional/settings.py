@@ -5,6 +5,9 @@ class TestSettings(BaseSettings):
     postgres_dsn: PostgresDsn
     redis_dsn: RedisDsn
     api_url: AnyUrl
+    grpc_target: str = "127.0.0.1:50051"
+    # auth-service напрямую, без nginx: /metrics и внутренние маршруты
+    service_url: AnyUrl = "http://127.0.0.1:8000"
     postgres_echo: bool = False
 
 
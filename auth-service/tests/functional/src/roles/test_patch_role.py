@@ -25,6 +25,33 @@ async def test_patch(
     assert set([r["name"] for r in response["body"]]) == {"admin", "joker"}
 
 
+async def test_patch_updates_token_roles(
+    patch_role,
+    create_role,
+    create_user_role,
+    refresh_tokens,
+    decode_token,
+    ivanov,
+    ivanov_login,
+    petrov,
+    petrov_login,
+    admin_role,
+    add_role,
+):
+    await add_role(ivanov["id"], admin_role["id"])
+    access_token = (await ivanov_login())["access_token"]
+    role_id = (await create_role(access_token, "subscriber"))["body"]["id"]
+    await create_user_role(access_token, petrov["id"], role_id)
+
+    # Роли petrov попадают в кеш при входе
+    petrov_tokens = await petrov_login()
+    assert decode_token(petrov_tokens["access_token"])["roles"] == ["subscriber"]
+
+    await patch_role(access_token, role_id, "premium")
+    response = await refresh_tokens(petrov_tokens["refresh_token"])
+    assert decode_token(response["body"]["access_token"])["roles"] == ["premium"]
+
+
 async def test_unauthorized(admin_role, make_request):
     response = await make_request(
         hdrs.METH_PATCH, f"/api/v1/roles/{admin_role['id']}", json={"name": "joker"}
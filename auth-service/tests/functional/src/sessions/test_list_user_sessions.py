@@ -1,4 +1,8 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
 from http import HTTPStatus
+from uuid import uuid4
 
 import pytest
 
@@ -34,6 +38,83 @@ async def test_pagination(list_user_sessions, ivanov, ivanov_login):
         assert len(response["body"]) == expected_len
 
 
+async def test_cursor_pagination(list_user_sessions, ivanov, ivanov_login):
+    for _ in range(5):
+        token = (await ivanov_login())["access_token"]
+
+    response = await list_user_sessions(token)
+    expected = [session["id"] for session in response["body"]]
+
+    pages = []
+    params = {"page_size": 2}
+    while True:
+        response = await list_user_sessions(token, params)
+        assert response["status"] == HTTPStatus.OK
+        pages.append([session["id"] for session in response["body"]])
+        if "X-Next-Cursor" not in response["headers"]:
+            break
+        params["cursor"] = response["headers"]["X-Next-Cursor"]
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sum(pages, []) == expected
+
+    # Новые входы не сдвигают уже начатый обход
+    await ivanov_login()
+    response = await list_user_sessions(token, params)
+    assert [session["id"] for session in response["body"]] == pages[-1]
+
+
+def make_cursor(data) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "invalid",
+        make_cursor("invalid"),
+        make_cursor(["2026-10-18T12:00:00", "invalid"]),
+        make_cursor(["invalid", str(uuid4())]),
+        make_cursor([1, str(uuid4())]),
+        make_cursor(["0001-01-01T00:00:00+03:00", str(uuid4())]),
+        make_cursor(["2026-10-18T12:00:00", str(uuid4()), "extra"]),
+    ],
+    ids=[
+        "not_base64_json",
+        "not_list",
+        "bad_id",
+        "bad_date",
+        "date_not_string",
+        "date_out_of_range",
+        "extra_item",
+    ],
+)
+async def test_invalid_cursor(list_user_sessions, ivanov, ivanov_login, cursor):
+    token = (await ivanov_login())["access_token"]
+    response = await list_user_sessions(token, {"cursor": cursor})
+    assert response["status"] == HTTPStatus.BAD_REQUEST
+
+
+async def test_cursor_with_timezone(list_user_sessions, ivanov, ivanov_login):
+    for _ in range(3):
+        token = (await ivanov_login())["access_token"]
+    response = await list_user_sessions(token, {"page_size": 1})
+    cursor = response["headers"]["X-Next-Cursor"]
+    response = await list_user_sessions(token, {"page_size": 1, "cursor": cursor})
+    expected = response["body"]
+
+    # Тот же момент времени в другом часовом поясе
+    data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    created_at, session_id = json.loads(data)
+    created_at = datetime.fromisoformat(created_at).replace(tzinfo=timezone.utc)
+    cursor = make_cursor(
+        [created_at.astimezone(timezone(timedelta(hours=3))).isoformat(), session_id]
+    )
+    response = await list_user_sessions(token, {"page_size": 1, "cursor": cursor})
+    assert response["status"] == HTTPStatus.OK
+    assert response["body"] == expected
+
+
 async def test_unauthorized(list_user_sessions):
     response = await list_user_sessions()
     assert response["status"] == HTTPStatus.UNAUTHORIZED
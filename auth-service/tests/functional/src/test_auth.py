@@ -1,7 +1,11 @@
+import asyncio
+import json
 from http import HTTPStatus
+from uuid import UUID
 
 import pytest
 from aiohttp import hdrs
+from sqlalchemy.sql import text
 
 pytestmark = pytest.mark.asyncio
 
@@ -18,6 +22,36 @@ async def test_login(login, ivanov, check_access, refresh_tokens):
     assert response["status"] == HTTPStatus.OK
 
 
+async def test_login_ignores_invalid_token(login, ivanov, make_request):
+    # Вход не проверяет токен, даже если он передан
+    response = await make_request(
+        hdrs.METH_POST,
+        "/api/v1/login",
+        json={"username": "ivanov@ya.ru", "password": "qwerty"},
+        headers={"Authorization": "Bearer invalid"},
+    )
+    assert response["status"] == HTTPStatus.OK
+
+
+async def test_login_session(ivanov, ivanov_login, decode_token, db):
+    tokens = await ivanov_login()
+    access = decode_token(tokens["access_token"])
+    refresh = decode_token(tokens["refresh_token"])
+
+    result = await db.execute(
+        text(
+            "SELECT id, access_jti, access_exp, refresh_jti, session_exp "
+            "FROM sessions"
+        )
+    )
+    session = result.one()
+    assert str(session.id) == access["session_id"] == refresh["session_id"]
+    assert str(session.access_jti) == access["jti"]
+    assert str(session.refresh_jti) == refresh["jti"]
+    assert session.access_exp.timestamp() == access["exp"]
+    assert session.session_exp.timestamp() == refresh["exp"]
+
+
 @pytest.mark.parametrize(
     "credentials",
     [
@@ -88,3 +122,111 @@ async def test_check_access_role(ivanov, ivanov_login, make_request):
         headers={"Authorization": f"Bearer {access_token}"},
     )
     assert response["status"] == HTTPStatus.FORBIDDEN
+
+
+async def test_check_access_revoked_elsewhere(
+    ivanov, ivanov_login, check_access, decode_token, redis_client
+):
+    access_token = (await ivanov_login())["access_token"]
+    response = await check_access(access_token)
+    assert response["status"] == HTTPStatus.NO_CONTENT
+
+    # Отзыв токена другим воркером: запись в Redis и сообщение в канал
+    claims = decode_token(access_token)
+    await redis_client.set(
+        b"denylist:jti:" + UUID(claims["jti"]).bytes, b"", exat=claims["exp"]
+    )
+    await redis_client.publish(
+        "denylist", json.dumps({"jti": claims["jti"], "exp": claims["exp"]})
+    )
+
+    for _ in range(10):
+        response = await check_access(access_token)
+        if response["status"] == HTTPStatus.UNAUTHORIZED:
+            break
+        await asyncio.sleep(0.1)
+    assert response["status"] == HTTPStatus.UNAUTHORIZED
+
+
+async def test_logout_writes_legacy_key(
+    ivanov, ivanov_login, logout, decode_token, redis_client
+):
+    access_token = (await ivanov_login())["access_token"]
+    await logout(access_token)
+
+    # Воркеры прежней версии во время выкладки ищут jti строкой
+    jti = decode_token(access_token)["jti"]
+    assert await redis_client.exists(b"denylist:jti:" + UUID(jti).bytes)
+    # Прежние воркеры проверяют значение через GET, пустое для них - не отзыв
+    assert await redis_client.get(jti)
+
+
+async def test_check_access_revoked_by_legacy_worker(
+    ivanov, ivanov_login, check_access, decode_token, redis_client
+):
+    access_token = (await ivanov_login())["access_token"]
+    response = await check_access(access_token)
+    assert response["status"] == HTTPStatus.NO_CONTENT
+
+    # Воркер прежней версии: только SETEX jti строкой, без сообщения в канал
+    jti = decode_token(access_token)["jti"]
+    await redis_client.setex(jti, 60, "logout")
+
+    response = await check_access(access_token)
+    assert response["status"] == HTTPStatus.UNAUTHORIZED
+
+
+async def test_check_access_batch(
+    check_access_batch, ivanov, ivanov_login, admin_role, add_role, logout
+):
+    tokens = [await ivanov_login() for _ in range(2)]
+    await logout(tokens[1]["access_token"])
+    await add_role(ivanov["id"], admin_role["id"])
+    admin_tokens = await ivanov_login()
+
+    response = await check_access_batch(
+        [
+            {"token": tokens[0]["access_token"]},
+            {"token": tokens[0]["access_token"], "allow_roles": ["admin"]},
+            {"token": admin_tokens["access_token"], "allow_roles": ["admin"]},
+            {"token": tokens[1]["access_token"]},
+            {"token": tokens[0]["refresh_token"]},
+            {"token": "invalid"},
+        ]
+    )
+    assert response["status"] == HTTPStatus.OK
+    assert [verdict["status_code"] for verdict in response["body"]["verdicts"]] == [
+        HTTPStatus.NO_CONTENT,
+        HTTPStatus.FORBIDDEN,
+        HTTPStatus.NO_CONTENT,
+        HTTPStatus.UNAUTHORIZED,
+        HTTPStatus.UNPROCESSABLE_ENTITY,
+        HTTPStatus.UNPROCESSABLE_ENTITY,
+    ]
+
+
+async def test_check_access_matches_batch(
+    check_access, check_access_batch, ivanov, ivanov_login, logout
+):
+    # check_access и check_access/batch проверяют токен одним кодом
+    tokens = [await ivanov_login() for _ in range(2)]
+    await logout(tokens[1]["access_token"])
+    checks = [
+        tokens[0]["access_token"],
+        tokens[1]["access_token"],
+        tokens[0]["refresh_token"],
+        "invalid",
+    ]
+
+    response = await check_access_batch([{"token": token} for token in checks])
+    for token, verdict in zip(checks, response["body"]["verdicts"]):
+        response = await check_access(token)
+        assert response["status"] == verdict["status_code"]
+        if verdict["status_code"] != HTTPStatus.NO_CONTENT:
+            assert response["body"]["detail"] == verdict["detail"]
+
+
+@pytest.mark.parametrize("count", [0, 101])
+async def test_check_access_batch_size(check_access_batch, count):
+    response = await check_access_batch([{"token": "invalid"}] * count)
+    assert response["status"] == HTTPStatus.UNPROCESSABLE_ENTITY
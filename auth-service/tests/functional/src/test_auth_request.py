@@ -0,0 +1,110 @@
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+from aiohttp import ClientSession
+
+from settings import settings
+
+pytestmark = pytest.mark.asyncio
+
+AUTHORIZE_URL = f"{settings.service_url}/internal/authorize"
+
+
+async def authorize(
+    aiohttp_session: ClientSession, access_token: str = None, allow_roles: str = ""
+):
+    headers = {"X-Request-Id": uuid4().hex, "X-Allow-Roles": allow_roles}
+    if access_token:
+        headers["Authorization"] = f"Bearer {access_token}"
+    async with aiohttp_session.get(AUTHORIZE_URL, headers=headers) as response:
+        return response.status, response.headers
+
+
+async def test_authorize(aiohttp_session: ClientSession, ivanov, ivanov_login, logout):
+    access_token = (await ivanov_login())["access_token"]
+
+    status, headers = await authorize(aiohttp_session, access_token)
+    assert status == HTTPStatus.OK
+    assert headers["X-User-Id"] == ivanov["id"]
+    assert headers["X-User-Roles"] == ""
+    max_age = int(headers["Cache-Control"].removeprefix("max-age="))
+    assert 0 < max_age <= 5
+
+    status, _ = await authorize(aiohttp_session, access_token, "admin,subscriber")
+    assert status == HTTPStatus.FORBIDDEN
+
+    await logout(access_token)
+    status, _ = await authorize(aiohttp_session, access_token)
+    assert status == HTTPStatus.UNAUTHORIZED
+
+
+async def test_authorize_invalid_token(aiohttp_session: ClientSession):
+    # auth_request понимает только 2xx, 401 и 403
+    status, _ = await authorize(aiohttp_session, "invalid")
+    assert status == HTTPStatus.UNAUTHORIZED
+
+    status, headers = await authorize(aiohttp_session)
+    assert status == HTTPStatus.UNAUTHORIZED
+    assert headers["Cache-Control"] == "no-store"
+
+
+async def get_through_nginx(
+    aiohttp_session: ClientSession, path: str, access_token: str = None
+):
+    headers = {"Authorization": f"Bearer {access_token}"} if access_token else {}
+    async with aiohttp_session.get(
+        f"{settings.api_url}{path}", headers=headers
+    ) as response:
+        return response.status, response.headers
+
+
+@pytest.mark.skipif(
+    settings.api_url == settings.service_url, reason="API_URL is not nginx"
+)
+async def test_auth_request_through_nginx(
+    aiohttp_session: ClientSession, ivanov, ivanov_login, logout
+):
+    # Location /test/* - tests/functional/nginx/auth_request.conf
+    access_token = (await ivanov_login())["access_token"]
+
+    status, headers = await get_through_nginx(
+        aiohttp_session, "/test/protected", access_token
+    )
+    assert status == HTTPStatus.OK
+    assert headers["X-User-Id"] == ivanov["id"]
+    assert headers["X-Auth-Cache"] == "MISS"
+
+    status, headers = await get_through_nginx(
+        aiohttp_session, "/test/protected", access_token
+    )
+    assert status == HTTPStatus.OK
+    assert headers["X-User-Id"] == ivanov["id"]
+    assert headers["X-Auth-Cache"] == "HIT"
+
+    # Вердикт с другими ролями кешируется отдельно
+    status, headers = await get_through_nginx(
+        aiohttp_session, "/test/admin", access_token
+    )
+    assert status == HTTPStatus.FORBIDDEN
+    assert headers["X-Auth-Cache"] == "MISS"
+
+    # Отзыв доходит до nginx только после AUTH_REQUEST_CACHE_SECONDS
+    await logout(access_token)
+    status, headers = await get_through_nginx(
+        aiohttp_session, "/test/protected", access_token
+    )
+    assert status == HTTPStatus.OK
+    assert headers["X-Auth-Cache"] == "HIT"
+
+    status, _ = await get_through_nginx(aiohttp_session, "/test/protected")
+    assert status == HTTPStatus.UNAUTHORIZED
+
+
+@pytest.mark.skipif(
+    settings.api_url == settings.service_url, reason="API_URL is not nginx"
+)
+async def test_internal_routes_closed_in_nginx(aiohttp_session: ClientSession):
+    for path in ["/internal/authorize", "/_auth", "/_auth/admin"]:
+        status, _ = await get_through_nginx(aiohttp_session, path)
+        assert status == HTTPStatus.NOT_FOUND
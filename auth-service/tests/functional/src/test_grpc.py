@@ -0,0 +1,71 @@
+import asyncio
+from http import HTTPStatus
+
+import grpc
+import pytest
+
+from grpc_api import auth_pb2, auth_pb2_grpc
+from settings import settings
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def auth_stub():
+    async with grpc.aio.insecure_channel(settings.grpc_target) as channel:
+        yield auth_pb2_grpc.AuthStub(channel)
+
+
+async def test_authorize(auth_stub, ivanov, ivanov_login, logout):
+    access_token = (await ivanov_login())["access_token"]
+
+    response = await auth_stub.Authorize(auth_pb2.AuthorizeRequest(token=access_token))
+    assert response.status_code == HTTPStatus.NO_CONTENT
+
+    response = await auth_stub.Authorize(
+        auth_pb2.AuthorizeRequest(token=access_token, allow_roles=["admin"])
+    )
+    assert response.status_code == HTTPStatus.FORBIDDEN
+
+    await logout(access_token)
+    response = await auth_stub.Authorize(auth_pb2.AuthorizeRequest(token=access_token))
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.detail == "Token has been revoked"
+
+
+async def test_authorize_many(auth_stub, ivanov, ivanov_login):
+    tokens = await ivanov_login()
+    requests = [
+        auth_pb2.AuthorizeRequest(token=tokens["access_token"]),
+        auth_pb2.AuthorizeRequest(token="invalid"),  # noqa: S106
+        auth_pb2.AuthorizeRequest(token=tokens["refresh_token"]),
+        auth_pb2.AuthorizeRequest(
+            token=tokens["access_token"], allow_roles=["admin", "subscriber"]
+        ),
+    ]
+
+    call = auth_stub.AuthorizeMany(iter(requests))
+    responses = [response async for response in call]
+    assert [response.status_code for response in responses] == [
+        HTTPStatus.NO_CONTENT,
+        HTTPStatus.UNPROCESSABLE_ENTITY,
+        HTTPStatus.UNPROCESSABLE_ENTITY,
+        HTTPStatus.FORBIDDEN,
+    ]
+
+
+async def test_authorize_many_interactive(auth_stub, ivanov, ivanov_login):
+    # Ответ приходит до конца потока запросов
+    access_token = (await ivanov_login())["access_token"]
+    call = auth_stub.AuthorizeMany()
+    for allow_roles, status_code in [
+        ([], HTTPStatus.NO_CONTENT),
+        (["admin"], HTTPStatus.FORBIDDEN),
+    ]:
+        await call.write(
+            auth_pb2.AuthorizeRequest(token=access_token, allow_roles=allow_roles)
+        )
+        response = await asyncio.wait_for(call.read(), timeout=5)
+        assert response.status_code == status_code
+    await call.done_writing()
+    assert await call.read() == grpc.aio.EOF
@@ -0,0 +1,66 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+async def explain(db: AsyncSession):
+    async def inner(query: str, **params) -> str:
+        # На пустых таблицах планировщику дешевле прочитать всё и
+        # отсортировать, поэтому запрещаем это: если подходящего индекса
+        # нет, seq scan или sort всё равно останутся в плане
+        await db.execute(text("SET LOCAL enable_seqscan = off"))
+        await db.execute(text("SET LOCAL enable_sort = off"))
+        result = await db.execute(
+            text(f"EXPLAIN {query}").bindparams(**params)  # noqa: S608
+        )
+        plan = "\n".join(row[0] for row in result)
+        await db.rollback()
+        return plan
+
+    return inner
+
+
+@pytest.mark.parametrize(
+    "query,index",
+    [
+        (
+            "SELECT * FROM sessions WHERE user_id = :id "
+            "ORDER BY created_at DESC, id DESC LIMIT 50",
+            "ix_sessions_user_id_created_at_id",
+        ),
+        (
+            "SELECT * FROM sessions WHERE user_id = :id "
+            "AND (created_at, id) < (LOCALTIMESTAMP, :id) "
+            "ORDER BY created_at DESC, id DESC LIMIT 50",
+            "ix_sessions_user_id_created_at_id",
+        ),
+        (
+            "SELECT * FROM sessions WHERE user_id = :id "
+            "AND (session_exp >= now() OR session_exp IS NULL) "
+            "ORDER BY created_at DESC, id DESC LIMIT 50",
+            "ix_sessions_user_id_created_at_id",
+        ),
+        (
+            "SELECT * FROM user_roles WHERE user_id = :id",
+            "ix_user_roles_user_id_role_id",
+        ),
+        (
+            "SELECT * FROM user_roles WHERE role_id = :id",
+            "ix_user_roles_role_id",
+        ),
+        (
+            "SELECT * FROM social_account WHERE user_id = :id",
+            "ix_social_account_user_id",
+        ),
+    ],
+)
+async def test_index_used(explain, query, index):
+    plan = await explain(query, id=uuid4())
+    assert index in plan
+    assert "Seq Scan" not in plan
+    assert "Sort" not in plan
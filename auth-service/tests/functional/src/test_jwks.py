@@ -0,0 +1,80 @@
+from http import HTTPStatus
+from pathlib import Path
+from uuid import uuid4
+
+import jwt
+import pytest
+from aiohttp import ClientSession
+
+from settings import settings
+
+pytestmark = pytest.mark.asyncio
+
+JWKS_URL = f"{settings.api_url}/.well-known/jwks.json"
+# Те же ключи, что в AUTHJWT_KEYS_DIR сервиса
+KEYS_DIR = Path(__file__).parents[1] / "keys"
+
+
+async def get_jwks(aiohttp_session: ClientSession) -> dict:
+    async with aiohttp_session.get(JWKS_URL) as response:
+        assert response.status == HTTPStatus.OK
+        return {key["kid"]: key for key in (await response.json())["keys"]}
+
+
+async def test_jwks_cache_headers(aiohttp_session: ClientSession):
+    async with aiohttp_session.get(JWKS_URL) as response:
+        assert response.status == HTTPStatus.OK
+        assert "max-age" in response.headers["Cache-Control"]
+        etag = response.headers["ETag"]
+
+    async with aiohttp_session.get(
+        JWKS_URL, headers={"If-None-Match": etag}
+    ) as response:
+        assert response.status == HTTPStatus.NOT_MODIFIED
+        assert response.headers["ETag"] == etag
+
+
+async def test_jwks_publishes_all_keys(aiohttp_session: ClientSession):
+    keys = await get_jwks(aiohttp_session)
+    assert {kid: key["alg"] for kid, key in keys.items()} == {
+        "2026-09-rsa": "RS256",
+        "2026-10-ed25519": "EdDSA",
+    }
+    # Только публичные части
+    assert all("d" not in key for key in keys.values())
+
+
+async def test_token_signed_with_published_key(
+    aiohttp_session: ClientSession, ivanov, ivanov_login
+):
+    keys = await get_jwks(aiohttp_session)
+    token = (await ivanov_login())["access_token"]
+
+    # Подписывает последний по имени ключ
+    header = jwt.get_unverified_header(token)
+    assert header == {"alg": "EdDSA", "kid": "2026-10-ed25519", "typ": "JWT"}
+    claims = jwt.decode(
+        token, jwt.PyJWK(keys[header["kid"]]).key, algorithms=[header["alg"]]
+    )
+    assert claims["sub"] == ivanov["id"]
+
+
+async def test_token_signed_with_previous_key(
+    ivanov, ivanov_login, check_access, decode_token
+):
+    # Токены, подписанные прежним ключом до замены, проверяются по kid
+    claims = decode_token((await ivanov_login())["access_token"])
+    claims["jti"] = str(uuid4())
+    private_key = (KEYS_DIR / "2026-09-rsa.pem").read_bytes()
+    token = jwt.encode(
+        claims, private_key, algorithm="RS256", headers={"kid": "2026-09-rsa"}
+    )
+    response = await check_access(token)
+    assert response["status"] == HTTPStatus.NO_CONTENT
+
+    # Ключ подписи должен совпадать с ключом kid
+    token = jwt.encode(
+        claims, private_key, algorithm="RS256", headers={"kid": "2026-10-ed25519"}
+    )
+    response = await check_access(token)
+    assert response["status"] == HTTPStatus.UNPROCESSABLE_ENTITY
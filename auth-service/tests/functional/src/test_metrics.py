@@ -0,0 +1,43 @@
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+from aiohttp import ClientSession
+
+from settings import settings
+
+pytestmark = pytest.mark.asyncio
+
+# nginx закрывает /metrics, Prometheus опрашивает сервис напрямую
+METRICS_URL = f"{settings.service_url}/metrics"
+
+
+async def get_metrics(aiohttp_session: ClientSession) -> str:
+    async with aiohttp_session.get(METRICS_URL) as response:
+        assert response.status == HTTPStatus.OK
+        assert response.headers["Content-Type"].startswith("text/plain")
+        return await response.text()
+
+
+async def test_request_latency_by_route_template(
+    aiohttp_session: ClientSession, patch_role
+):
+    await patch_role("invalid", str(uuid4()), "joker")
+
+    metrics = await get_metrics(aiohttp_session)
+    # Путь с конкретным id сведён к шаблону маршрута
+    assert (
+        'http_request_duration_seconds_count{method="PATCH",'
+        'route="/api/v1/roles/{role_id}",status="422"}'
+    ) in metrics
+
+
+async def test_dependency_latency(aiohttp_session: ClientSession, ivanov, ivanov_login):
+    await ivanov_login()
+
+    metrics = await get_metrics(aiohttp_session)
+    assert (
+        'db_statement_seconds_count{database="primary",operation="SELECT"}' in metrics
+    )
+    assert 'redis_command_seconds_count{command="MGET"}' in metrics
+    assert 'password_hash_seconds_count{operation="verify"}' in metrics
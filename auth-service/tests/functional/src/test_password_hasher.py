@@ -0,0 +1,25 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_overloaded_hasher_returns_503(ivanov, login):
+    # Очередь хеширования в тестовом окружении - 4 операции на воркер
+    responses = await asyncio.gather(
+        *(login("ivanov@ya.ru", "qwerty") for _ in range(30))
+    )
+    statuses = [response["status"] for response in responses]
+    assert HTTPStatus.SERVICE_UNAVAILABLE in statuses
+    assert HTTPStatus.OK in statuses
+    assert {
+        response["body"]["detail"]
+        for response in responses
+        if response["status"] == HTTPStatus.SERVICE_UNAVAILABLE
+    } == {"Password hasher is overloaded"}
+
+    # Когда очередь разобрана, вход снова работает
+    response = await login("ivanov@ya.ru", "qwerty")
+    assert response["status"] == HTTPStatus.OK
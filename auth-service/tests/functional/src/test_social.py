@@ -0,0 +1,20 @@
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from aiohttp import ClientSession
+
+from settings import settings
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_login_redirect_stores_state_in_session(aiohttp_session: ClientSession):
+    async with aiohttp_session.get(
+        f"{settings.api_url}/api/v1/google/login", allow_redirects=False
+    ) as response:
+        assert response.status == HTTPStatus.TEMPORARY_REDIRECT
+        location = urlparse(response.headers["Location"])
+        assert location.netloc == "accounts.google.com"
+        assert parse_qs(location.query)["state"]
+        assert "session" in response.cookies
@@ -0,0 +1,141 @@
+from http import HTTPStatus
+from typing import Awaitable
+
+import pytest
+from aiohttp import ClientSession, hdrs
+
+from settings import settings
+
+pytestmark = pytest.mark.asyncio
+
+METRICS_URL = f"{settings.service_url}/metrics"
+
+
+@pytest.fixture
+def count_statements(aiohttp_session: ClientSession):
+    """Выполняет запрос к API и возвращает ответ и число его SQL-запросов.
+
+    Число берётся из db_statement_seconds_count всех баз в /metrics до и
+    после запроса, поэтому запросы должны идти по одному.
+    """
+
+    async def total() -> int:
+        async with aiohttp_session.get(METRICS_URL) as response:
+            assert response.status == HTTPStatus.OK
+            metrics = await response.text()
+        return sum(
+            int(float(line.rsplit(" ", 1)[1]))
+            for line in metrics.splitlines()
+            if line.startswith("db_statement_seconds_count{")
+        )
+
+    async def inner(request: Awaitable[dict]) -> tuple[dict, int]:
+        before = await total()
+        response = await request
+        return response, await total() - before
+
+    return inner
+
+
+async def test_statement_count(
+    count_statements,
+    make_request,
+    register,
+    login,
+    logout,
+    refresh_tokens,
+    check_access,
+    list_user_sessions,
+    end_user_session,
+    list_roles,
+    create_role,
+    patch_role,
+    delete_role,
+    create_user_role,
+    delete_user_role,
+    admin_role,
+    add_role,
+):
+    """Число SQL-запросов не зависит от объёма данных и не растёт незаметно."""
+    counts = {}
+
+    response, counts["register"] = await count_statements(
+        register({"email": "ivanov@ya.ru", "password": "qwerty", "name": "Ivan Ivanov"})
+    )
+    ivanov_id = response["body"]["id"]
+    response = await register(
+        {"email": "petrov@ya.ru", "password": "qwerty", "name": "Petr Petrov"}
+    )
+    petrov_id = response["body"]["id"]
+    await add_role(ivanov_id, admin_role["id"])
+
+    _, counts["login"] = await count_statements(login("ivanov@ya.ru", "qwerty"))
+    response, counts["login, roles cached"] = await count_statements(
+        login("ivanov@ya.ru", "qwerty")
+    )
+    tokens = response["body"]
+
+    response, counts["refresh_tokens"] = await count_statements(
+        refresh_tokens(tokens["refresh_token"])
+    )
+    tokens = response["body"]
+    token = tokens["access_token"]
+
+    _, counts["check_access"] = await count_statements(check_access(token))
+
+    headers = {"Authorization": f"Bearer {token}"}
+    _, counts["get_current_user"] = await count_statements(
+        make_request(hdrs.METH_GET, "/api/v1/user", headers=headers)
+    )
+    _, counts["patch_current_user"] = await count_statements(
+        make_request(
+            hdrs.METH_PATCH, "/api/v1/user", json={"name": "Ivan"}, headers=headers
+        )
+    )
+
+    response, counts["list_user_sessions"] = await count_statements(
+        list_user_sessions(token)
+    )
+    session_id = response["body"][-1]["id"]
+    _, counts["end_user_session"] = await count_statements(
+        end_user_session(session_id, token)
+    )
+
+    _, counts["list_roles"] = await count_statements(list_roles(token))
+    response, counts["create_role"] = await count_statements(
+        create_role(token, "subscriber")
+    )
+    role_id = response["body"]["id"]
+    _, counts["patch_role"] = await count_statements(
+        patch_role(token, role_id, "premium")
+    )
+
+    response, counts["create_user_role"] = await count_statements(
+        create_user_role(token, petrov_id, role_id)
+    )
+    assert response["status"] == HTTPStatus.NO_CONTENT
+    _, counts["delete_user_role"] = await count_statements(
+        delete_user_role(token, petrov_id, role_id)
+    )
+    _, counts["delete_role"] = await count_statements(delete_role(token, role_id))
+
+    _, counts["logout"] = await count_statements(logout(token))
+
+    assert counts == {
+        "register": 2,
+        "login": 3,
+        "login, roles cached": 2,
+        "refresh_tokens": 2,
+        "check_access": 0,
+        "get_current_user": 1,
+        "patch_current_user": 1,
+        "list_user_sessions": 1,
+        "end_user_session": 2,
+        "list_roles": 1,
+        "create_role": 2,
+        "patch_role": 1,
+        "create_user_role": 3,
+        "delete_user_role": 1,
+        "delete_role": 1,
+        "logout": 1,
+    }
@@ -79,3 +79,29 @@ async def test_user_role_exists(
     ivanov_token = (await ivanov_login())["access_token"]
     response = await create_user_role(ivanov_token, ivanov["id"], admin_role["id"])
     assert response["status"] == HTTPStatus.BAD_REQUEST
+
+
+async def test_create_revokes_all_sessions(
+    create_user_role,
+    ivanov,
+    ivanov_login,
+    petrov,
+    petrov_login,
+    admin_role,
+    add_role,
+    check_access,
+):
+    petrov_tokens = [(await petrov_login())["access_token"] for _ in range(3)]
+
+    await add_role(ivanov["id"], admin_role["id"])
+    ivanov_token = (await ivanov_login())["access_token"]
+    response = await create_user_role(ivanov_token, petrov["id"], admin_role["id"])
+    assert response["status"] == HTTPStatus.NO_CONTENT
+
+    for token in petrov_tokens:
+        response = await check_access(token)
+        assert response["status"] == HTTPStatus.UNAUTHORIZED
+
+    # Токены администратора не затронуты
+    response = await check_access(ivanov_token)
+    assert response["status"] == HTTPStatus.NO_CONTENT
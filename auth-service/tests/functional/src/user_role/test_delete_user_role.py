@@ -58,3 +58,30 @@ async def test_not_found(delete_user_role, admin_role, ivanov, add_role, ivanov_
     access_token = (await ivanov_login())["access_token"]
     response = await delete_user_role(access_token, str(uuid4()), str(uuid4()))
     assert response["status"] == HTTPStatus.NOT_FOUND
+
+
+async def test_revoke_after_generation_expired(
+    create_user_role,
+    delete_user_role,
+    ivanov,
+    ivanov_login,
+    petrov,
+    petrov_login,
+    admin_role,
+    add_role,
+    check_access,
+    redis_client,
+):
+    await add_role(ivanov["id"], admin_role["id"])
+    ivanov_token = (await ivanov_login())["access_token"]
+    response = await create_user_role(ivanov_token, petrov["id"], admin_role["id"])
+    assert response["status"] == HTTPStatus.NO_CONTENT
+
+    # Токен выдан после первого отзыва, ключ поколения истекает раньше него
+    petrov_token = (await petrov_login())["access_token"]
+    await redis_client.delete(f"denylist:gen:{petrov['id']}")
+
+    response = await delete_user_role(ivanov_token, petrov["id"], admin_role["id"])
+    assert response["status"] == HTTPStatus.NO_CONTENT
+    response = await check_access(petrov_token)
+    assert response["status"] == HTTPStatus.UNAUTHORIZED